@@ -0,0 +1 @@
+# Paquete compartido de Alba Conecta (acceso a datos y utilidades)
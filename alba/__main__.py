@@ -0,0 +1,165 @@
+# ==========================================
+#     HERRAMIENTAS DE MANTENIMIENTO (CLI)
+# ==========================================
+# Uso: python -m alba [--db archivo.db] <comando> ...
+import argparse
+import os
+import sqlite3
+import sys
+
+from alba import blobs, db, estadisticas, intercambio, migraciones, respaldo, retencion
+
+
+def cmd_estadisticas(conn, args):
+    if args.accion == "reconstruir":
+        total = estadisticas.reconstruir(conn)
+        conn.commit()
+        print(f"Contadores reconstruidos para {total} usuario(s).")
+        return 0
+    diferencias = estadisticas.verificar(conn)
+    for email, guardado, calculado in diferencias:
+        print(f"{email}: guardado={guardado} calculado={calculado}")
+    if diferencias:
+        print(f"{len(diferencias)} usuario(s) con contadores desfasados. Ejecuta 'estadisticas reconstruir'.")
+        return 1
+    print("Contadores OK.")
+    return 0
+
+
+def cmd_importar(conn, args):
+    try:
+        formato = intercambio.formato_de(args.archivo, args.formato)
+        with intercambio.abrir(args.archivo, "r") as archivo:
+            total = intercambio.importar(conn, args.tabla, archivo, formato, dir_fotos=args.fotos,
+                                         tam_lote=args.lote,
+                                         avance=lambda n: print(f"  {n} fila(s)...", file=sys.stderr))
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    conn.execute("PRAGMA optimize")
+    print(f"{total} fila(s) importada(s) en {args.tabla}.")
+    return 0
+
+
+def cmd_exportar(conn, args):
+    try:
+        formato = intercambio.formato_de(args.archivo, args.formato)
+        archivo = intercambio.abrir(args.archivo, "w")
+        try:
+            total = intercambio.exportar(conn, args.tabla, archivo, formato, dir_fotos=args.fotos,
+                                         tam_lote=args.lote)
+        finally:
+            if archivo is not sys.stdout:
+                archivo.close()
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{total} fila(s) exportada(s) de {args.tabla}.", file=sys.stderr)
+    return 0
+
+
+def cmd_retencion(conn, args):
+    tablas = args.tablas or list(retencion.POLITICAS)
+    if args.simular:
+        for tabla in tablas:
+            print(f"{tabla}: {retencion.candidatos(conn, tabla, args.dias)} fila(s) por archivar")
+        return 0
+    movidas = retencion.archivar(conn, tablas, dias=args.dias, limite=args.lote,
+                                 avance=lambda t, n: print(f"  {t}: {n}...", file=sys.stderr))
+    for tabla, n in movidas.items():
+        print(f"{tabla}: {n} fila(s) archivada(s) en {retencion.RUTA_ARCHIVO}")
+    # De a poco: cada llamada toma el lock de escritura solo un momento
+    liberadas = 0
+    while True:
+        n = retencion.vacuum_incremental(conn, args.paginas)
+        if n is None:
+            print("La base no tiene auto_vacuum incremental; no se liberó espacio.")
+            break
+        liberadas += n
+        if n < args.paginas:
+            print(f"{liberadas} página(s) devuelta(s) al sistema.")
+            break
+    if args.fotos:
+        borradas = retencion.recolectar_fotos(conn, blobs.BlobStore(blobs.DIR_BLOBS))
+        print(f"{borradas} foto(s) sin uso borrada(s) del almacén.")
+    return 0
+
+
+def cmd_respaldo(conn, args):
+    if args.listar:
+        for ruta in respaldo.respaldos(args.db, args.destino):
+            print(f"{ruta}  {os.path.getsize(ruta) / 1e6:.1f} MB")
+        return 0
+    try:
+        ruta, segundos = respaldo.respaldar(args.db, args.destino, comprimir=args.comprimir,
+                                            conservar=args.conservar, paginas=args.paginas, pausa=args.pausa)
+    except (respaldo.RespaldoInvalido, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Respaldo verificado: {ruta} ({os.path.getsize(ruta) / 1e6:.1f} MB, {segundos:.1f} s)")
+    return 0
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m alba", description="Mantenimiento de Alba Conecta")
+    parser.add_argument("--db", default=db.DB_PATH, help=f"base de datos (por defecto {db.DB_PATH})")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_est = comandos.add_parser("estadisticas", help="contadores de reputación y seguidores")
+    p_est.add_argument("accion", choices=["reconstruir", "verificar"])
+    p_est.set_defaults(func=cmd_estadisticas)
+
+    p_imp = comandos.add_parser("importar", help="cargar filas desde CSV o JSONL")
+    p_imp.add_argument("tabla", choices=list(intercambio.COLUMNAS))
+    p_imp.add_argument("archivo", help="ruta del archivo, o - para la entrada estándar")
+    p_imp.add_argument("--formato", choices=intercambio.FORMATOS, help="por defecto según la extensión")
+    p_imp.add_argument("--fotos", help="carpeta con las fotos nombradas en la columna 'foto' (productos)")
+    p_imp.add_argument("--lote", type=int, default=intercambio.TAM_LOTE, help="filas por transacción")
+    p_imp.set_defaults(func=cmd_importar)
+
+    p_exp = comandos.add_parser("exportar", help="volcar una tabla a CSV o JSONL")
+    p_exp.add_argument("tabla", choices=list(intercambio.COLUMNAS))
+    p_exp.add_argument("archivo", help="ruta del archivo, o - para la salida estándar")
+    p_exp.add_argument("--formato", choices=intercambio.FORMATOS, help="por defecto según la extensión")
+    p_exp.add_argument("--fotos", help="carpeta donde copiar las fotos originales (productos)")
+    p_exp.add_argument("--lote", type=int, default=intercambio.TAM_LOTE, help="filas leídas por bloque")
+    p_exp.set_defaults(func=cmd_exportar)
+
+    p_ret = comandos.add_parser("retencion", help="mover filas antiguas al archivo y liberar espacio")
+    p_ret.add_argument("--tablas", nargs="*", choices=list(retencion.POLITICAS))
+    p_ret.add_argument("--dias", type=int, help="antigüedad mínima (por defecto la de cada política)")
+    p_ret.add_argument("--lote", type=int, default=retencion.TAM_LOTE, help="filas por transacción")
+    p_ret.add_argument("--paginas", type=int, default=retencion.PAGINAS_VACUUM,
+                       help="páginas por paso de incremental_vacuum")
+    p_ret.add_argument("--fotos", action="store_true", help="borrar también las fotos sin uso")
+    p_ret.add_argument("--simular", action="store_true", help="solo contar lo que se archivaría")
+    p_ret.set_defaults(func=cmd_retencion)
+
+    p_resp = comandos.add_parser("respaldo", help="respaldo en caliente, verificado y con rotación")
+    p_resp.add_argument("--destino", default=respaldo.DIR_RESPALDOS,
+                        help=f"carpeta de respaldos (por defecto {respaldo.DIR_RESPALDOS})")
+    p_resp.add_argument("--comprimir", action="store_true", help="guardar como .db.gz")
+    p_resp.add_argument("--conservar", type=int, default=respaldo.CONSERVAR, help="respaldos a mantener")
+    p_resp.add_argument("--paginas", type=int, default=respaldo.PAGINAS_POR_PASO, help="páginas por paso")
+    p_resp.add_argument("--pausa", type=float, default=respaldo.PAUSA, help="segundos entre pasos")
+    p_resp.add_argument("--listar", action="store_true", help="solo mostrar los respaldos existentes")
+    p_resp.set_defaults(func=cmd_respaldo)
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    pool = db.ConnectionPool(args.db, tamaño=1)
+    try:
+        with pool.conexion() as conn:
+            if migraciones.falta_vacuum(conn):
+                print("VACUUM completo pendiente (auto_vacuum incremental); puede tardar...", file=sys.stderr)
+            migraciones.migrar(conn)
+            return args.func(conn, args)
+    finally:
+        pool.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# ==========================================
+#   ALMACÉN DE FOTOS DIRECCIONADO POR HASH
+# ==========================================
+# Las fotos viven como archivos en blobs/ab/cdef..., donde el nombre es el
+# SHA-256 del contenido. Dos subidas idénticas comparten el mismo archivo y
+# la tabla productos solo guarda el hash.
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+
+from alba import imagenes
+
+DIR_BLOBS = 'blobs'
+# Una foto recién guardada aún no tiene su fila en productos: la recolección
+# no toca archivos más nuevos que esto (segundos)
+EDAD_MINIMA_GC = 3600
+
+
+class BlobStore:
+
+    def __init__(self, raiz=DIR_BLOBS):
+        self.raiz = raiz
+        os.makedirs(raiz, exist_ok=True)
+
+    def ruta(self, clave):
+        return os.path.join(self.raiz, clave[:2], clave[2:])
+
+    def existe(self, clave):
+        return bool(clave) and os.path.exists(self.ruta(clave))
+
+    def guardar(self, datos):
+        """Guarda los bytes y devuelve su hash. Si ya existían no se reescriben."""
+        clave = hashlib.sha256(datos).hexdigest()
+        destino = self.ruta(clave)
+        if os.path.exists(destino):
+            os.utime(destino)   # vuelve a estar "recién guardado" para recolectar()
+            return clave
+        carpeta = os.path.dirname(destino)
+        os.makedirs(carpeta, exist_ok=True)
+        # Escritura atómica: archivo temporal + rename
+        fd, temporal = tempfile.mkstemp(dir=carpeta, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, destino)
+        except Exception:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        return clave
+
+    def leer(self, clave):
+        if not self.existe(clave):
+            return None
+        with open(self.ruta(clave), 'rb') as f:
+            return f.read()
+
+    def mapear(self, clave):
+        """mmap de solo lectura del blob (sin copiarlo a memoria)."""
+        if not self.existe(clave):
+            return None
+        with open(self.ruta(clave), 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def claves(self):
+        for carpeta in os.listdir(self.raiz):
+            ruta_carpeta = os.path.join(self.raiz, carpeta)
+            if len(carpeta) != 2 or not os.path.isdir(ruta_carpeta):
+                continue
+            for nombre in os.listdir(ruta_carpeta):
+                if not nombre.startswith('.tmp-'):
+                    yield carpeta + nombre
+
+    def recolectar(self, claves_en_uso, edad_minima=0):
+        """Borra los blobs que ya no referencia ningún producto. Devuelve cuántos borró."""
+        en_uso = set(claves_en_uso)
+        limite = time.time() - edad_minima
+        borrados = 0
+        for clave in list(self.claves()):
+            if clave not in en_uso and os.path.getmtime(self.ruta(clave)) <= limite:
+                os.remove(self.ruta(clave))
+                borrados += 1
+        return borrados
+
+
+def guardar_foto(store, datos):
+    """Guarda original, miniatura y mediana; devuelve sus tres hashes."""
+    miniatura, media = imagenes.generar_versiones(datos)
+    return store.guardar(datos), store.guardar(miniatura), store.guardar(media)
+
+
+def claves_en_uso(conn):
+    filas = conn.execute("SELECT foto_hash, miniatura_hash, media_hash FROM productos").fetchall()
+    return {clave for fila in filas for clave in fila if clave}
+
+
+def migrar_fotos(conn, store):
+    """Saca los BLOB de productos.foto al almacén de archivos.
+
+    Reutiliza las miniaturas de fotos_producto si existen, elimina esa tabla
+    y la columna foto. Devuelve cuántas fotos se movieron.
+    """
+    columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(productos)")]
+    if 'foto' not in columnas:
+        return 0
+    for columna in ('foto_hash', 'miniatura_hash', 'media_hash'):
+        if columna not in columnas:
+            conn.execute(f"ALTER TABLE productos ADD COLUMN {columna} TEXT")
+    hay_versiones = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='fotos_producto'").fetchone()
+
+    movidas = 0
+    ids = [fila[0] for fila in conn.execute("SELECT id FROM productos WHERE foto IS NOT NULL")]
+    for prod_id in ids:
+        foto = conn.execute("SELECT foto FROM productos WHERE id = ?", (prod_id,)).fetchone()[0]
+        versiones = None
+        if hay_versiones:
+            versiones = conn.execute("SELECT miniatura, media FROM fotos_producto WHERE producto_id = ?", (prod_id,)).fetchone()
+        if versiones and versiones[0] and versiones[1]:
+            hashes = (store.guardar(foto), store.guardar(versiones[0]), store.guardar(versiones[1]))
+        else:
+            hashes = guardar_foto(store, foto)
+        conn.execute("UPDATE productos SET foto = NULL, foto_hash = ?, miniatura_hash = ?, media_hash = ? WHERE id = ?",
+                     hashes + (prod_id,))
+        movidas += 1
+
+    conn.execute("DROP TRIGGER IF EXISTS fotos_producto_borrar")
+    conn.execute("DROP TABLE IF EXISTS fotos_producto")
+    conn.execute("ALTER TABLE productos DROP COLUMN foto")
+    return movidas
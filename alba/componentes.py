@@ -0,0 +1,306 @@
+# ==========================================
+#     AVISOS Y COMPONENTES CON FRAGMENTOS
+# ==========================================
+# Piezas de interfaz que comparten varias páginas. En vez de st.success +
+# time.sleep + st.rerun: el aviso se guarda en la sesión y se muestra como
+# toast en la siguiente ejecución, sin dejar el hilo dormido. Seguir,
+# calificar y escribir viven en st.fragment: al usarlos solo se vuelve a
+# ejecutar ese componente, no la página entera con sus consultas (sus
+# callbacks también avisan con flash, que el fragmento muestra al redibujarse).
+import functools
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from alba import consultas, perfilado
+from alba.consultas import CURSOR_INICIAL, PRECIO_SIN_LIMITE
+from alba.recursos import get_cache, get_cache_replica, get_escritor, get_registro, get_replica, ruta_foto
+
+LISTA_CARRERAS = ["Ing. Civil Minas", "Ing. Civil Industrial", "Enfermería", "Derecho", "Geología", "Otras"]
+LISTA_PREGUNTAS = ["Nombre de tu primera mascota", "Ciudad donde naciste", "Nombre de tu madre", "Tu comida favorita", "Nombre de tu colegio"]
+
+def flash(mensaje, icono="✅"):
+    st.session_state.setdefault('flash', []).append((mensaje, icono))
+
+def mostrar_flash():
+    for mensaje, icono in st.session_state.pop('flash', []):
+        st.toast(mensaje, icon=icono)
+
+def cambios_locales():
+    # Cambios hechos dentro de un fragmento que el feed (leído antes) aún no
+    # refleja. Se descartan en cada ejecución completa de la página.
+    return st.session_state.setdefault('cambios_locales', {})
+
+# Los callbacks y los refrescos de un fragmento no pasan por app.py: sus
+# consultas se anotan aparte en el registro (ver alba/perfilado.py). Un
+# fragmento dibujado en una ejecución completa cuenta en esa ejecución.
+def _callback(funcion):
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with perfilado.aparte(f"callback {funcion.__name__}"):
+            return funcion(*args, **kwargs)
+    return envoltura
+
+def _fragmento(funcion):
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        ctx = get_script_run_ctx()
+        if ctx is None or not ctx.fragment_ids_this_run:
+            return funcion(*args, **kwargs)
+        with perfilado.aparte(f"fragmento {funcion.__name__}"):
+            return funcion(*args, **kwargs)
+    return envoltura
+
+@_callback
+def seguir(yo, email_otro, nombre_otro):
+    consultas.seguir(yo, email_otro)
+    cambios_locales()[('sigue', email_otro)] = True
+    flash(f"Siguiendo a {nombre_otro}", "➕")
+
+@_callback
+def dejar_de_seguir(yo, email_otro, nombre_otro):
+    consultas.dejar_de_seguir(yo, email_otro)
+    cambios_locales()[('sigue', email_otro)] = False
+    flash(f"Dejaste de seguir a {nombre_otro}", "👋")
+
+@_callback
+def enviar_mensaje(yo, email_otro, saludo, clave_texto):
+    consultas.enviar_mensaje(yo, email_otro, f"{saludo} {st.session_state[clave_texto]}")
+    flash("Enviado!", "📩")
+
+@_callback
+def calificar(yo, email_otro, clave):
+    consultas.calificar(yo, email_otro, st.session_state[f"stars_{clave}"], st.session_state[f"comment_{clave}"])
+    cambios_locales()[('califico', email_otro)] = True
+    flash("Gracias!", "⭐")
+
+@st.fragment
+@_fragmento
+def boton_seguir(yo, email_otro, nombre_otro, sigue, clave):
+    mostrar_flash()
+    sigue = cambios_locales().get(('sigue', email_otro), sigue)
+    if sigue:
+        st.button("Dejar de seguir", key=f"unfol_{clave}", on_click=dejar_de_seguir, args=(yo, email_otro, nombre_otro))
+    else:
+        st.button("Seguir ➕", key=f"fol_{clave}", on_click=seguir, args=(yo, email_otro, nombre_otro))
+
+@st.fragment
+@_fragmento
+def popover_mensaje(yo, email_otro, etiqueta, saludo, clave):
+    mostrar_flash()
+    with st.popover(etiqueta):
+        with st.form(clave, clear_on_submit=True):
+            st.text_area("Mensaje:", key=f"txt_{clave}")
+            st.form_submit_button("Enviar", on_click=enviar_mensaje, args=(yo, email_otro, saludo, f"txt_{clave}"))
+
+@st.fragment
+@_fragmento
+def popover_calificar(yo, email_otro, nombre_otro, ya_califico, clave):
+    mostrar_flash()
+    ya_califico = cambios_locales().get(('califico', email_otro), ya_califico)
+    with st.popover("⭐ Calificar"):
+        if ya_califico:
+            st.warning(f"Ya has calificado a {nombre_otro}.")
+        else:
+            st.write(f"Calificar a **{nombre_otro}**")
+            with st.form(f"rate_form_{clave}"):
+                st.slider("Estrellas", 1, 5, 5, key=f"stars_{clave}")
+                st.text_input("Comentario", key=f"comment_{clave}")
+                st.form_submit_button("Enviar Reseña", on_click=calificar, args=(yo, email_otro, clave))
+
+# --- TARJETAS ---
+# item: fila de SQL_FEED_PRODUCTOS; sol: fila de SQL_SOLICITUDES + lo sigo
+def tarjeta_producto(item, yo):
+    with st.container(border=True):
+        c1, c2 = st.columns([1, 2])
+        with c1:
+            miniatura = ruta_foto(item[4])
+            if miniatura:
+                st.image(miniatura, use_container_width=True)
+                ampliar = st.toggle("🔍 Ampliar", key=f"zoom_{item[0]}")
+            else:
+                st.text("📷 Sin foto")
+        with c2:
+            st.subheader(item[1])
+            c_rep, c_follow = st.columns([2,1])
+            reputacion = consultas.formato_reputacion(item[8], item[9])
+            c_rep.caption(f"Vendedor: {item[5]} | {reputacion}")
+            
+            if item[6] != yo:
+                with c_follow:
+                    boton_seguir(yo, item[6], item[5], item[10], item[0])
+
+            st.write(f"_{item[2]}_")
+            st.caption(f"📅 {item[7]}")
+            st.metric("Precio", f"${item[3]}")
+            
+            col_chat, col_rate = st.columns(2)
+            
+            if item[6] != yo:
+                with col_chat:
+                    popover_mensaje(yo, item[6], "📩 Chat", f"Hola, me interesa '{item[1]}'.", f"msg_form_{item[0]}")
+                with col_rate:
+                    popover_calificar(yo, item[6], item[5], item[11], item[0])
+
+        if miniatura and ampliar:
+            foto_media = ruta_foto(item[12])
+            if foto_media:
+                st.image(foto_media, use_container_width=True)
+
+def tarjeta_solicitud(sol, yo):
+    with st.container(border=True):
+        c1, c2 = st.columns([3, 1])
+        with c1:
+            st.markdown(f"### 🔍 Busco: {sol[0]}")
+            st.write(f"_{sol[2]}_")
+            c_user, c_fol = st.columns([2,1])
+            c_user.caption(f"📅 {sol[5]} | {sol[3]}")
+            if sol[4] != yo:
+                with c_fol:
+                    boton_seguir(yo, sol[4], sol[3], sol[7], f"s_{sol[6]}")
+        with c2:
+            st.metric("Ofrece", f"${sol[1]}")
+            if sol[4] != yo:
+                popover_mensaje(yo, sol[4], "📩 Responder", f"Hola, vi que buscas '{sol[0]}'.", f"sol_form_{sol[6]}")
+
+# --- PAGINACIÓN ---
+def cursor_pagina(clave, filtros=(), inicial=CURSOR_INICIAL):
+    # Pila de cursores de las páginas visitadas (para volver atrás).
+    # Si cambian los filtros se vuelve a la primera página.
+    if st.session_state.get(f"{clave}_filtros") != filtros or clave not in st.session_state:
+        st.session_state[f"{clave}_filtros"] = filtros
+        st.session_state[clave] = [inicial]
+    return st.session_state[clave][-1]
+
+def controles_pagina(clave, siguiente, hay_mas):
+    pila = st.session_state[clave]
+    col_ant, col_num, col_sig = st.columns(3)
+    if len(pila) > 1 and col_ant.button("⬅️ Anterior", key=f"{clave}_ant"):
+        pila.pop()
+        st.rerun()
+    col_num.caption(f"Página {len(pila)}")
+    if hay_mas and col_sig.button("Siguiente ➡️", key=f"{clave}_sig"):
+        pila.append(siguiente)
+        st.rerun()
+
+def filtros_busqueda(clave, etiqueta_precio, estados=None):
+    # Caja de búsqueda + filtros. Devuelve (consulta_fts, estado, mínimo, máximo)
+    with st.expander("🔎 Buscar y filtrar"):
+        texto = st.text_input("Buscar", key=f"buscar_{clave}")
+        cols = st.columns(3 if estados else 2)
+        minimo = cols[0].number_input(f"{etiqueta_precio} mínimo", min_value=0, step=500, key=f"min_{clave}")
+        maximo = cols[1].number_input(f"{etiqueta_precio} máximo (0 = sin límite)", min_value=0, step=500, key=f"max_{clave}")
+        estado = cols[2].selectbox("Estado", estados, key=f"estado_{clave}") if estados else None
+    return consultas.consulta_fts(texto), estado, minimo, (maximo or PRECIO_SIN_LIMITE)
+
+# --- HILO DE CHAT EN LA SESIÓN ---
+# El panel del chat y el aviso de no leídos se refrescan solos (fragmentos con
+# run_every), sin rerun de la página. Cada refresco del chat solo lee la
+# versión del hilo (conversaciones.ultimo_id, casi siempre desde la caché) y
+# pide los mensajes nuevos únicamente si cambió.
+INTERVALO_CHAT = 3       # segundos
+INTERVALO_AVISOS = 15
+
+def cargar_chat(yo, otro):
+    # Buffer del hilo en la sesión: {"mensajes": [...], "hay_anteriores": bool, "version": id}
+    clave = f"chat_{otro}"
+    buffer = st.session_state.get(clave)
+    version = consultas.get_version_chat(yo, otro)
+    if buffer is None:
+        # Sin caché: la ventana tiene que incluir todo hasta `version`, o el
+        # próximo refresco saltaría los mensajes que faltan
+        mensajes, hay_anteriores = consultas.get_chat_anteriores(yo, otro, cache=False)
+        buffer = {"mensajes": mensajes, "hay_anteriores": hay_anteriores, "version": version}
+        st.session_state[clave] = buffer
+    elif buffer.get("version") != version:
+        ultimo_id = buffer["mensajes"][-1][0] if buffer["mensajes"] else 0
+        nuevos = consultas.get_chat_nuevos(yo, otro, ultimo_id)
+        buffer["mensajes"].extend(nuevos)
+        buffer["version"] = version
+        # Llegaron mensajes con el hilo abierto: ya los está viendo
+        if any(m[1] == otro for m in nuevos):
+            consultas.marcar_leidos(yo, otro)
+    return buffer
+
+@_callback
+def cargar_chat_anteriores(yo, otro):
+    buffer = st.session_state[f"chat_{otro}"]
+    if "cursor_archivo" in buffer:
+        return cargar_chat_archivado(yo, otro)
+    primer_id = buffer["mensajes"][0][0] if buffer["mensajes"] else CURSOR_INICIAL
+    anteriores, buffer["hay_anteriores"] = consultas.get_chat_anteriores(yo, otro, primer_id)
+    buffer["mensajes"][:0] = anteriores
+
+@_callback
+def cargar_chat_archivado(yo, otro):
+    # El archivo tiene sus propios ids; se recorre con su cursor y se intercala
+    # por id con lo que ya está en pantalla
+    buffer = st.session_state[f"chat_{otro}"]
+    archivados, buffer["hay_anteriores"] = consultas.get_chat_archivado(
+        yo, otro, buffer.get("cursor_archivo", CURSOR_INICIAL))
+    if archivados:
+        buffer["cursor_archivo"] = archivados[0][0]
+        buffer["mensajes"] = sorted(archivados + buffer["mensajes"], key=lambda m: m[0])
+    else:
+        buffer["cursor_archivo"] = None
+        flash("No hay mensajes archivados en esta conversación.", "🗄️")
+
+@_callback
+def responder(yo, otro):
+    texto = st.session_state["input_msg"]
+    if texto:
+        consultas.enviar_mensaje(yo, otro, texto)
+
+@st.fragment(run_every=INTERVALO_CHAT)
+@_fragmento
+def panel_chat(yo, otro):
+    chat = cargar_chat(yo, otro)
+    with st.container(height=400):
+        if chat["hay_anteriores"]:
+            st.button("⬆️ Ver mensajes anteriores", key="chat_anteriores",
+                      on_click=cargar_chat_anteriores, args=(yo, otro))
+        elif "cursor_archivo" not in chat and consultas.hay_archivo():
+            st.button("🗄️ Ver historial archivado", key="chat_archivo",
+                      on_click=cargar_chat_archivado, args=(yo, otro))
+        for msg in chat["mensajes"]:
+            es_mio = (msg[1] == yo)
+            with st.chat_message("user" if es_mio else "assistant", avatar="👤" if es_mio else "🎓"):
+                st.write(msg[2])
+                st.caption(msg[3])
+    with st.form("chat_input", clear_on_submit=True):
+        col_txt, col_btn = st.columns([4, 1])
+        col_txt.text_input("Escribe tu respuesta...", key="input_msg")
+        col_btn.form_submit_button("Enviar ➤", on_click=responder, args=(yo, otro))
+
+@st.fragment(run_every=INTERVALO_AVISOS)
+@_fragmento
+def aviso_no_leidos(email):
+    # Mensajes donde destinatario soy YO y leido = 0 (contador precalculado)
+    msg_nuevos = consultas.get_no_leidos(email)
+    if msg_nuevos > 0:
+        st.error(f"🔔 Tienes {msg_nuevos} mensaje(s) nuevo(s)")
+    else:
+        st.success("📭 Sin mensajes nuevos")
+
+# --- PANEL DE DEPURACIÓN ---
+# Solo para los correos de ALBA_ADMINS. Se dibuja al final del script para
+# que los totales incluyan todas las consultas de la ejecución.
+def panel_depuracion(rerun):
+    registro = get_registro()
+    with st.sidebar.expander("🛠️ Depuración"):
+        t = rerun.totales()
+        st.caption(f"**{rerun.pagina}**: {t['consultas']} consultas, {t['ms_bd']} ms en BD de {t['ms_total']} ms "
+                   f"(caché {t['cache']} · lecturas {t['lectura']} · réplica {t['replica']} · escrituras {t['escritura']})")
+        if rerun.registros:
+            st.dataframe(pd.DataFrame(rerun.registros, columns=["llamada", "origen", "ms", "filas", "sql"]),
+                         hide_index=True)
+        lentas = registro.lentas()
+        st.caption(f"Consultas lentas (≥ {registro.umbral_ms:g} ms): {len(lentas)}")
+        for r in lentas[-5:]:
+            st.code(f"{r['ms']} ms · {r['pagina']} · {r['llamada']}\n{r['sql']}\n→ {r['plan']}", language="text")
+        metricas = {"cache": get_cache().metricas(), "escritor": get_escritor().metricas()}
+        if get_replica() is not None:
+            metricas["cache_replica"] = get_cache_replica().metricas()
+        st.json(metricas, expanded=False)
+        st.download_button("⬇️ Historial (CSV)", registro.exportar_csv(), file_name="consultas.csv", mime="text/csv")
@@ -0,0 +1,400 @@
+# ==========================================
+#           LÓGICA DE NEGOCIO
+# ==========================================
+# Consultas que usan las páginas. Todas pasan por run_query (pool, caché de
+# lecturas y escritor único); las filas se devuelven como tuplas. Las marcadas
+# con replica=True pueden salir de la réplica de lectura si está configurada.
+import re
+from datetime import datetime
+
+from alba import credenciales
+from alba.recursos import hay_archivo, leer_archivo, run_query
+
+
+# --- CUENTAS ---
+def login_user(email, password):
+    """(fila_usuario, error). La fila queda en session_state para toda la sesión."""
+    limitador = credenciales.limitador_login
+    if limitador.bloqueado(email):
+        return None, "Demasiados intentos fallidos. Espera unos minutos."
+    # Credenciales sin caché: un cambio de contraseña en otro proceso no la invalida
+    result = run_query("SELECT * FROM usuarios WHERE email = ?", (email,), return_data=True, cache=False)
+    usuario = result[0] if result else None
+    ok, rehashear = credenciales.verificar_en_pool(password, usuario[2] if usuario else None).result()
+    if not (usuario and ok):
+        limitador.fallo(email)
+        return None, "Correo o contraseña incorrectos"
+    limitador.exito(email)
+    if rehashear:
+        # Hash antiguo (SHA-256 sin sal): se reemplaza ahora que conocemos la clave
+        nuevo = credenciales.hashear_en_pool(password).result()
+        run_query("UPDATE usuarios SET password = ? WHERE email = ?", (nuevo, email))
+        usuario = usuario[:2] + (nuevo,) + usuario[3:]
+    return usuario, None
+
+def verificar_respuesta(email, respuesta, guardada):
+    limitador = credenciales.limitador_recuperacion
+    if limitador.bloqueado(email):
+        return False
+    respuesta = respuesta.lower().strip()
+    ok, rehashear = credenciales.verificar_en_pool(respuesta, guardada).result()
+    if not ok:
+        limitador.fallo(email)
+        return False
+    limitador.exito(email)
+    if rehashear:
+        nueva = credenciales.hashear_en_pool(respuesta).result()
+        run_query("UPDATE usuarios SET respuesta = ? WHERE email = ?", (nueva, email))
+    return True
+
+def register_user(email, nombre, password, whatsapp, carrera, pregunta, respuesta):
+    try:
+        hashed_pswd = credenciales.hashear_en_pool(password).result()
+        hashed_resp = credenciales.hashear_en_pool(respuesta.lower().strip()).result()
+        run_query("INSERT INTO usuarios (email, nombre, password, whatsapp, carrera, pregunta, respuesta) VALUES (?,?,?,?,?,?,?)", 
+                 (email, nombre, hashed_pswd, whatsapp, carrera, pregunta, hashed_resp))
+        return True
+    except:
+        return False
+
+def get_pregunta(email):
+    # (pregunta, hash de la respuesta) o None
+    res = run_query("SELECT pregunta, respuesta FROM usuarios WHERE email = ?", (email,), return_data=True, cache=False)
+    return res[0] if res else None
+
+def cambiar_password(email, password):
+    nuevo = credenciales.hashear_en_pool(password).result()
+    run_query("UPDATE usuarios SET password = ? WHERE email = ?", (nuevo, email))
+
+def actualizar_datos(email, nombre, whatsapp, carrera):
+    run_query("UPDATE usuarios SET nombre=?, whatsapp=?, carrera=? WHERE email=?", (nombre, whatsapp, carrera, email))
+
+# --- REPUTACIÓN Y SEGUIDORES ---
+def formato_reputacion(promedio, total):
+    if promedio:
+        promedio = round(promedio, 1)
+        estrellas_str = "⭐" * int(promedio)
+        return f"{promedio} {estrellas_str} ({total})"
+    return "🆕 Nuevo"
+
+def get_estadisticas(email):
+    # (promedio, total reseñas, seguidores, seguidos) desde los contadores mantenidos por triggers
+    res = run_query("SELECT suma_estrellas, total_resenas, seguidores, seguidos FROM estadisticas_usuario WHERE email = ?",
+                    (email,), return_data=True, replica=True)
+    if not res:
+        return None, 0, 0, 0
+    suma, total, seguidores, seguidos = res[0]
+    return (suma / total if total else None), total, seguidores, seguidos
+
+def get_reputacion(email_usuario):
+    promedio, total, _, _ = get_estadisticas(email_usuario)
+    return formato_reputacion(promedio, total)
+
+def check_follow(seguidor, seguido):
+    res = run_query("SELECT * FROM seguidores WHERE seguidor=? AND seguido=?", (seguidor, seguido), return_data=True)
+    return True if res else False
+
+def seguir(yo, email_otro):
+    run_query("INSERT OR IGNORE INTO seguidores (seguidor, seguido) VALUES (?,?)", (yo, email_otro))
+
+def dejar_de_seguir(yo, email_otro):
+    run_query("DELETE FROM seguidores WHERE seguidor=? AND seguido=?", (yo, email_otro))
+
+def get_seguidores(email):
+    return run_query("SELECT u.nombre, u.email, u.carrera FROM usuarios u JOIN seguidores s ON u.email = s.seguidor WHERE s.seguido = ?", (email,), return_data=True, replica=True)
+
+def get_seguidos(email):
+    return run_query("SELECT u.nombre, u.email, u.carrera, u.whatsapp FROM usuarios u JOIN seguidores s ON u.email = s.seguido WHERE s.seguidor = ?", (email,), return_data=True, replica=True)
+
+def calificar(yo, email_otro, estrellas, comentario):
+    fecha_hoy = datetime.now().strftime("%d-%m-%Y")
+    run_query("INSERT INTO resenas (calificador, calificado, estrellas, comentario, fecha) VALUES (?,?,?,?,?)",
+             (yo, email_otro, estrellas, comentario, fecha_hoy))
+
+# --- PAGINACIÓN POR CURSOR (keyset) ---
+# Los feeds se leen con "id < cursor LIMIT n": cada rerun solo consulta y
+# dibuja la página visible, sin importar cuántos avisos se acumulen.
+TAM_PAGINA = 20
+CURSOR_INICIAL = 2**63 - 1  # mayor que cualquier id
+
+# --- BÚSQUEDA ---
+PRECIO_SIN_LIMITE = CURSOR_INICIAL
+
+def consulta_fts(texto):
+    # Texto libre -> consulta FTS5 segura: cada palabra como prefijo ("bici"*),
+    # todas obligatorias. Sin palabras devuelve "" (no hay búsqueda).
+    palabras = re.findall(r"\w+", texto or "")
+    return " ".join(f'"{p}"*' for p in palabras)
+
+# --- FEED DEL CATÁLOGO ---
+# Una consulta trae la página con la reputación del vendedor (igual para
+# todos, así que la caché la comparte entre usuarios) y otra, por usuario, a
+# quién sigue y a quién ya calificó; _con_marcas las junta. Antes eran 3
+# consultas por ítem. El CTE "pagina" cambia según sea el feed normal o una
+# búsqueda.
+SQL_FEED_PRODUCTOS = """
+    WITH pagina AS ({pagina})
+    SELECT p.id, p.nombre, p.descripcion, p.precio, p.miniatura_hash, u.nombre, p.email_dueño, p.fecha,
+           est.suma_estrellas * 1.0 / NULLIF(est.total_resenas, 0), COALESCE(est.total_resenas, 0),
+           p.media_hash
+    FROM pagina p
+    JOIN usuarios u ON p.email_dueño = u.email
+    LEFT JOIN estadisticas_usuario est ON est.email = p.email_dueño
+    ORDER BY {orden}
+"""
+
+SQL_MARCAS = """
+    SELECT seguido, 1 FROM seguidores WHERE seguidor = ?
+    UNION
+    SELECT calificado, 2 FROM resenas WHERE calificador = ?
+"""
+
+def _marcas(email_actual):
+    # (a quién sigo, a quién ya califiqué)
+    marcas = run_query(SQL_MARCAS, (email_actual, email_actual), return_data=True, replica=True) or []
+    return {otro for otro, tipo in marcas if tipo == 1}, {otro for otro, tipo in marcas if tipo == 2}
+
+def _con_marcas(email_actual, filas):
+    # Deja cada fila como antes: ..., total reseñas, lo sigo, ya lo califiqué, media_hash
+    if not filas:
+        return filas
+    seguidos, calificados = _marcas(email_actual)
+    return [f[:10] + (f[6] in seguidos, f[6] in calificados) + f[10:] for f in filas]
+
+def _con_seguidos(email_actual, filas):
+    # Solicitudes: agrega al final si sigo al solicitante
+    if not filas:
+        return filas
+    seguidos, _ = _marcas(email_actual)
+    return [f + (f[4] in seguidos,) for f in filas]
+
+# Sin filtro de precio se recorre idx_productos_estado_id hacia atrás y se corta en
+# LIMIT; con filtro se deja que SQLite elija (puede convenir el índice de precio)
+SQL_CATALOGO = SQL_FEED_PRODUCTOS.format(pagina="""
+        SELECT id, nombre, descripcion, precio, miniatura_hash, media_hash, email_dueño, fecha
+        FROM productos
+        WHERE estado = ? AND id < ?
+        ORDER BY id DESC LIMIT ?""", orden="p.id DESC")
+
+SQL_CATALOGO_PRECIO = SQL_FEED_PRODUCTOS.format(pagina="""
+        SELECT id, nombre, descripcion, precio, miniatura_hash, media_hash, email_dueño, fecha
+        FROM productos
+        WHERE estado = ? AND precio BETWEEN ? AND ? AND id < ?
+        ORDER BY id DESC LIMIT ?""", orden="p.id DESC")
+
+# Resultados ordenados por relevancia (bm25, el nombre pesa más que la descripción).
+# CROSS JOIN obliga a partir del índice FTS: si SQLite parte por el índice de
+# precio, evalúa el MATCH fila por fila y la búsqueda tarda segundos.
+SQL_BUSQUEDA_PRODUCTOS = SQL_FEED_PRODUCTOS.format(pagina="""
+        SELECT p.id, p.nombre, p.descripcion, p.precio, p.miniatura_hash, p.media_hash, p.email_dueño, p.fecha,
+               bm25(productos_fts, 10.0, 1.0) AS relevancia
+        FROM productos_fts
+        CROSS JOIN productos p ON p.id = productos_fts.rowid
+        WHERE productos_fts MATCH ? AND p.estado = ? AND p.precio BETWEEN ? AND ?
+        ORDER BY relevancia LIMIT ? OFFSET ?""", orden="p.relevancia, p.id DESC")
+
+def get_catalogo(email_actual, cursor=CURSOR_INICIAL, limite=TAM_PAGINA,
+                 estado="Disponible", precio_min=0, precio_max=PRECIO_SIN_LIMITE):
+    # Se pide una fila extra solo para saber si hay página siguiente
+    if precio_min > 0 or precio_max < PRECIO_SIN_LIMITE:
+        filas = run_query(SQL_CATALOGO_PRECIO, (estado, precio_min, precio_max, cursor, limite + 1),
+                          return_data=True, replica=True) or []
+    else:
+        filas = run_query(SQL_CATALOGO, (estado, cursor, limite + 1), return_data=True, replica=True) or []
+    return _con_marcas(email_actual, filas[:limite]), len(filas) > limite
+
+def buscar_productos(email_actual, consulta, offset=0, limite=TAM_PAGINA,
+                     estado="Disponible", precio_min=0, precio_max=PRECIO_SIN_LIMITE):
+    filas = run_query(SQL_BUSQUEDA_PRODUCTOS,
+                      (consulta, estado, precio_min, precio_max, limite + 1, offset),
+                      return_data=True, replica=True) or []
+    return _con_marcas(email_actual, filas[:limite]), len(filas) > limite
+
+# --- PARA TI ---
+# Lee el top N ya puntuado por alba.feed: una búsqueda por idx_feed_puntaje
+SQL_PARA_TI = SQL_FEED_PRODUCTOS.format(pagina="""
+        SELECT p.id, p.nombre, p.descripcion, p.precio, p.miniatura_hash, p.media_hash, p.email_dueño, p.fecha,
+               f.puntaje
+        FROM feed_personalizado f
+        JOIN productos p ON p.id = f.item_id
+        WHERE f.email = ? AND f.tipo = 'p' AND p.estado = 'Disponible'
+        ORDER BY f.puntaje DESC LIMIT ?""", orden="p.puntaje DESC")
+
+SQL_PARA_TI_SOLICITUDES = """
+    SELECT s.titulo, s.presupuesto, s.descripcion, u.nombre, s.email_solicitante, s.fecha, s.id
+    FROM feed_personalizado f
+    JOIN solicitudes s ON s.id = f.item_id
+    JOIN usuarios u ON s.email_solicitante = u.email
+    WHERE f.email = ? AND f.tipo = 's'
+    ORDER BY f.puntaje DESC LIMIT ?
+"""
+
+def get_para_ti(email, limite=TAM_PAGINA):
+    return _con_marcas(email, run_query(SQL_PARA_TI, (email, limite), return_data=True, replica=True) or [])
+
+def get_para_ti_solicitudes(email, limite=TAM_PAGINA):
+    return _con_seguidos(email, run_query(SQL_PARA_TI_SOLICITUDES, (email, limite), return_data=True, replica=True) or [])
+
+# --- PRODUCTOS DE UN USUARIO ---
+def publicar_producto(email, nombre, descripcion, precio, hashes):
+    fecha_hoy = datetime.now().strftime("%d-%m-%Y")
+    run_query("INSERT INTO productos (nombre, descripcion, precio, estado, email_dueño, fecha, foto_hash, miniatura_hash, media_hash) VALUES (?,?,?,?,?,?,?,?,?)",
+             (nombre, descripcion, precio, "Disponible", email, fecha_hoy) + tuple(hashes))
+
+def get_productos_disponibles(email):
+    return run_query("SELECT nombre, precio FROM productos WHERE email_dueño=? AND estado='Disponible'", (email,), True,
+                     replica=True)
+
+def get_mis_productos(email):
+    return run_query("SELECT id, nombre, descripcion, precio, estado FROM productos WHERE email_dueño=?", (email,), True)
+
+def actualizar_producto(id_producto, nombre, descripcion, precio):
+    run_query("UPDATE productos SET nombre=?, descripcion=?, precio=? WHERE id=?", (nombre, descripcion, precio, id_producto))
+
+def cambiar_estado_producto(id_producto, estado):
+    run_query("UPDATE productos SET estado=? WHERE id=?", (estado, id_producto))
+
+def borrar_producto(id_producto):
+    run_query("DELETE FROM productos WHERE id=?", (id_producto,))
+
+# --- SOLICITUDES ---
+SQL_SOLICITUDES = """
+    SELECT s.titulo, s.presupuesto, s.descripcion, u.nombre, s.email_solicitante, s.fecha, s.id
+    FROM solicitudes s
+    JOIN usuarios u ON s.email_solicitante = u.email
+    WHERE s.id < ?
+    ORDER BY s.id DESC LIMIT ?
+"""
+
+SQL_SOLICITUDES_PRESUPUESTO = """
+    SELECT s.titulo, s.presupuesto, s.descripcion, u.nombre, s.email_solicitante, s.fecha, s.id
+    FROM solicitudes s
+    JOIN usuarios u ON s.email_solicitante = u.email
+    WHERE s.presupuesto BETWEEN ? AND ? AND s.id < ?
+    ORDER BY s.id DESC LIMIT ?
+"""
+
+SQL_BUSQUEDA_SOLICITUDES = """
+    SELECT s.titulo, s.presupuesto, s.descripcion, u.nombre, s.email_solicitante, s.fecha, s.id
+    FROM solicitudes_fts
+    CROSS JOIN solicitudes s ON s.id = solicitudes_fts.rowid
+    JOIN usuarios u ON s.email_solicitante = u.email
+    WHERE solicitudes_fts MATCH ? AND s.presupuesto BETWEEN ? AND ?
+    ORDER BY bm25(solicitudes_fts, 10.0, 1.0), s.id DESC LIMIT ? OFFSET ?
+"""
+
+def get_solicitudes(email_actual, cursor=CURSOR_INICIAL, limite=TAM_PAGINA, presupuesto_min=0,
+                    presupuesto_max=PRECIO_SIN_LIMITE):
+    if presupuesto_min > 0 or presupuesto_max < PRECIO_SIN_LIMITE:
+        filas = run_query(SQL_SOLICITUDES_PRESUPUESTO, (presupuesto_min, presupuesto_max, cursor, limite + 1),
+                          return_data=True, replica=True) or []
+    else:
+        filas = run_query(SQL_SOLICITUDES, (cursor, limite + 1), return_data=True, replica=True) or []
+    return _con_seguidos(email_actual, filas[:limite]), len(filas) > limite
+
+def buscar_solicitudes(email_actual, consulta, offset=0, limite=TAM_PAGINA, presupuesto_min=0,
+                       presupuesto_max=PRECIO_SIN_LIMITE):
+    filas = run_query(SQL_BUSQUEDA_SOLICITUDES, (consulta, presupuesto_min, presupuesto_max, limite + 1, offset),
+                      return_data=True, replica=True) or []
+    return _con_seguidos(email_actual, filas[:limite]), len(filas) > limite
+
+def publicar_solicitud(email, titulo, presupuesto, descripcion):
+    fecha_hoy = datetime.now().strftime("%d-%m-%Y")
+    run_query("INSERT INTO solicitudes (titulo, presupuesto, descripcion, email_solicitante, fecha) VALUES (?,?,?,?,?)",
+             (titulo, presupuesto, descripcion, email, fecha_hoy))
+
+def get_titulos_solicitudes(email):
+    return run_query("SELECT titulo FROM solicitudes WHERE email_solicitante=?", (email,), True, replica=True)
+
+def get_mis_solicitudes(email):
+    return run_query("SELECT id, titulo, descripcion, presupuesto FROM solicitudes WHERE email_solicitante = ?", (email,), return_data=True)
+
+def actualizar_solicitud(id_solicitud, titulo, descripcion, presupuesto):
+    run_query("UPDATE solicitudes SET titulo=?, descripcion=?, presupuesto=? WHERE id=?",
+             (titulo, descripcion, presupuesto, id_solicitud))
+
+def borrar_solicitud(id_solicitud):
+    run_query("DELETE FROM solicitudes WHERE id=?", (id_solicitud,))
+
+# --- MENSAJES ---
+def get_no_leidos(email):
+    # Contador mantenido por triggers en mensajes: una lectura por clave primaria.
+    # Sin caché: la caché es por proceso y no se entera de lo que escriben los demás
+    res = run_query("SELECT n FROM no_leidos WHERE email = ?", (email,), return_data=True, cache=False)
+    return res[0][0] if res else 0
+
+# Lee el índice de conversaciones (mantenido por triggers en mensajes), más
+# reciente primero, con los no leídos de MI lado de cada hilo.
+SQL_BANDEJA = """
+    SELECT c.otro, u.nombre, c.extracto, c.ultima_fecha, c.no_leidos
+    FROM (
+        SELECT usuario_b AS otro, ultimo_id, extracto, ultima_fecha, no_leidos_a AS no_leidos
+        FROM conversaciones WHERE usuario_a = ? AND usuario_b != usuario_a
+        UNION ALL
+        SELECT usuario_a, ultimo_id, extracto, ultima_fecha, no_leidos_b
+        FROM conversaciones WHERE usuario_b = ? AND usuario_a != usuario_b
+    ) c
+    JOIN usuarios u ON u.email = c.otro
+    ORDER BY c.ultimo_id DESC
+"""
+
+def get_bandeja(email):
+    # Sin caché, igual que el contador: si no, la bandeja y el aviso no coinciden
+    return run_query(SQL_BANDEJA, (email, email), return_data=True, cache=False) or []
+
+def enviar_mensaje(yo, email_otro, texto):
+    # Enviamos con leido=0 (default)
+    ahora = datetime.now().strftime("%Y-%m-%d %H:%M")
+    run_query("INSERT INTO mensajes (remitente, destinatario, mensaje, fecha_hora) VALUES (?,?,?,?)",
+             (yo, email_otro, texto, ahora))
+
+def marcar_leidos(yo, email_otro):
+    # Si hay mensajes de ESA persona para MÍ que están en 0, los paso a 1
+    run_query("UPDATE mensajes SET leido = 1 WHERE remitente = ? AND destinatario = ? AND leido = 0", (email_otro, yo))
+
+# --- HISTORIAL DE CHAT POR VENTANAS ---
+# Al abrir un hilo se leen solo los últimos TAM_CHAT mensajes, los anteriores
+# se piden aparte y en cada rerun solo se consultan los de id mayor al último
+# ya cargado.
+TAM_CHAT = 30
+
+# Cada rama baja por el índice (remitente, destinatario) y corta en LIMIT,
+# así no se ordena el historial completo
+SQL_CHAT_ANTERIORES = """
+    SELECT id, remitente, mensaje, fecha_hora FROM (
+        SELECT * FROM (SELECT id, remitente, mensaje, fecha_hora FROM mensajes
+                       WHERE remitente = ? AND destinatario = ? AND id < ? ORDER BY id DESC LIMIT ?)
+        UNION ALL
+        SELECT * FROM (SELECT id, remitente, mensaje, fecha_hora FROM mensajes
+                       WHERE remitente = ? AND destinatario = ? AND id < ? ORDER BY id DESC LIMIT ?)
+    ) ORDER BY id DESC LIMIT ?
+"""
+
+SQL_CHAT_NUEVOS = """
+    SELECT id, remitente, mensaje, fecha_hora FROM mensajes
+    WHERE (remitente = ? AND destinatario = ? AND id > ?) OR (remitente = ? AND destinatario = ? AND id > ?)
+    ORDER BY id ASC
+"""
+
+def get_chat_anteriores(yo, otro, antes_de=CURSOR_INICIAL, limite=TAM_CHAT, cache=True):
+    # Devuelve (mensajes en orden cronológico, hay más antiguos)
+    filas = run_query(SQL_CHAT_ANTERIORES, (yo, otro, antes_de, limite + 1, otro, yo, antes_de, limite + 1, limite + 1),
+                      return_data=True, cache=cache) or []
+    return filas[:limite][::-1], len(filas) > limite
+
+def get_chat_nuevos(yo, otro, despues_de):
+    return run_query(SQL_CHAT_NUEVOS, (yo, otro, despues_de, otro, yo, despues_de),
+                     return_data=True, cache=False) or []
+
+def get_chat_archivado(yo, otro, antes_de=CURSOR_INICIAL, limite=TAM_CHAT):
+    # Igual que get_chat_anteriores, pero sobre los mensajes archivados
+    filas = leer_archivo(SQL_CHAT_ANTERIORES, (yo, otro, antes_de, limite + 1, otro, yo, antes_de, limite + 1, limite + 1))
+    return filas[:limite][::-1], len(filas) > limite
+
+def get_version_chat(yo, otro):
+    # Sonda barata para el refresco del chat: último id del hilo según el
+    # índice de conversaciones (una lectura por clave primaria). Va sin caché:
+    # los mensajes que escribe otro proceso no invalidan la de este
+    res = run_query("SELECT ultimo_id FROM conversaciones WHERE usuario_a = min(?, ?) AND usuario_b = max(?, ?)",
+                    (yo, otro, yo, otro), return_data=True, cache=False)
+    return res[0][0] if res else 0
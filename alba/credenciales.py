@@ -0,0 +1,113 @@
+# ==========================================
+#     CONTRASEÑAS Y RESPUESTAS DE SEGURIDAD
+# ==========================================
+# scrypt con sal por usuario en vez de SHA-256 simple. El cálculo es caro a
+# propósito, así que corre en un pool acotado de hilos: una ola de logins
+# hace cola ahí en vez de acaparar la CPU de las sesiones que navegan.
+# Los hashes SHA-256 antiguos se siguen aceptando y se rehashean al entrar.
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Parámetros ajustables por entorno (n debe ser potencia de 2)
+SCRYPT_N = int(os.environ.get("ALBA_SCRYPT_N", 2**14))
+SCRYPT_R = int(os.environ.get("ALBA_SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("ALBA_SCRYPT_P", 1))
+HILOS_KDF = int(os.environ.get("ALBA_HILOS_KDF", 2))
+
+_pool_kdf = ThreadPoolExecutor(max_workers=HILOS_KDF, thread_name_prefix="kdf")
+
+
+def _b64(datos):
+    return base64.b64encode(datos).decode("ascii")
+
+
+def _scrypt(secreto, sal, n, r, p):
+    return hashlib.scrypt(secreto.encode(), salt=sal, n=n, r=r, p=p,
+                          maxmem=128 * r * n * 2, dklen=32)
+
+
+def es_legado(guardado):
+    # SHA-256 sin sal de las versiones anteriores: 64 caracteres hex
+    return bool(guardado) and len(guardado) == 64 and not guardado.startswith("scrypt$")
+
+
+def hashear(secreto, n=None, r=None, p=None):
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    sal = secrets.token_bytes(16)
+    return f"scrypt${n}${r}${p}${_b64(sal)}${_b64(_scrypt(secreto, sal, n, r, p))}"
+
+
+def verificar(secreto, guardado):
+    """(coincide, hay_que_rehashear)."""
+    if not guardado:
+        return False, False
+    if es_legado(guardado):
+        ok = hmac.compare_digest(hashlib.sha256(secreto.encode()).hexdigest(), guardado)
+        return ok, ok
+    try:
+        _, n, r, p, sal, esperado = guardado.split("$")
+        n, r, p = int(n), int(r), int(p)
+        calculado = _scrypt(secreto, base64.b64decode(sal), n, r, p)
+    except ValueError:
+        return False, False
+    ok = hmac.compare_digest(calculado, base64.b64decode(esperado))
+    # Si cambiaron los parámetros se actualiza el hash al entrar
+    return ok, ok and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+# Hash de relleno: si el correo no existe se verifica igual contra algo, para
+# que el tiempo de respuesta no delate qué correos están registrados
+_HASH_RELLENO = hashear(secrets.token_hex(8))
+
+
+def verificar_en_pool(secreto, guardado):
+    """Future con el resultado de verificar(), calculado en el pool de KDF."""
+    return _pool_kdf.submit(verificar, secreto, guardado or _HASH_RELLENO)
+
+
+def hashear_en_pool(secreto):
+    return _pool_kdf.submit(hashear, secreto)
+
+
+class LimitadorIntentos:
+    """Máximo de intentos fallidos por clave (email) dentro de una ventana."""
+
+    def __init__(self, max_intentos=5, ventana=300.0):
+        self.max_intentos = max_intentos
+        self.ventana = ventana
+        self._fallos = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def _limpiar(self, clave, ahora):
+        fallos = self._fallos[clave]
+        while fallos and fallos[0] < ahora - self.ventana:
+            fallos.popleft()
+        return fallos
+
+    def bloqueado(self, clave):
+        with self._lock:
+            fallos = self._limpiar(clave, time.monotonic())
+            bloqueado = len(fallos) >= self.max_intentos
+            if not fallos:
+                del self._fallos[clave]
+            return bloqueado
+
+    def fallo(self, clave):
+        with self._lock:
+            ahora = time.monotonic()
+            self._limpiar(clave, ahora).append(ahora)
+
+    def exito(self, clave):
+        with self._lock:
+            self._fallos.pop(clave, None)
+
+
+limitador_login = LimitadorIntentos()
+limitador_recuperacion = LimitadorIntentos(max_intentos=3, ventana=900.0)
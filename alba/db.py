@@ -0,0 +1,446 @@
+# ==========================================
+#      CAPA DE ACCESO A DATOS (SQLite)
+# ==========================================
+# Pool de conexiones reutilizables por proceso. Cada conexión se abre una
+# sola vez, se configura con los PRAGMA de abajo y se devuelve al pool al
+# terminar, en vez de conectar/cerrar en cada consulta.
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, TimeoutError as FuturoVencido
+from contextlib import contextmanager
+
+DB_PATH = 'arriendos_udalba.db'
+
+# Segundos que una sesión espera el commit de su escritura antes de rendirse
+ESPERA_ESCRITURA = float(os.environ.get("ALBA_ESPERA_ESCRITURA", 30))
+
+# Se aplican al abrir cada conexión
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",          # lectores no bloquean al escritor
+    "PRAGMA synchronous=NORMAL",        # seguro con WAL y mucho más rápido
+    "PRAGMA busy_timeout=5000",         # esperar el lock en vez de fallar al tiro
+    "PRAGMA cache_size=-16000",         # ~16 MB de caché de páginas por conexión
+    "PRAGMA mmap_size=268435456",       # 256 MB mapeados en memoria
+    "PRAGMA temp_store=MEMORY",
+)
+
+_RE_LECTURA = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_RE_ESCRITURA = re.compile(r"\b(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+_RE_TABLAS_LEIDAS = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+_RE_TABLAS_ESCRITAS = re.compile(
+    r"\b(?:(?:INSERT|REPLACE)(?:\s+OR\s+\w+)?\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(?!SET\b)([A-Za-z_]\w*)",
+    re.IGNORECASE)
+_RE_TRIGGER_TABLA = re.compile(r"\bON\s+([A-Za-z_]\w*)\s+(?:FOR\s+EACH\s+ROW\s+)?(?:WHEN\b|BEGIN\b)", re.IGNORECASE)
+
+
+def es_lectura(query):
+    """True si la sentencia solo lee (no necesita commit)."""
+    return bool(_RE_LECTURA.match(query)) and not _RE_ESCRITURA.search(query)
+
+
+def tablas_leidas(query):
+    # Incluye nombres de CTE; no molesta porque nadie escribe en ellos
+    return {t.lower() for t in _RE_TABLAS_LEIDAS.findall(query)}
+
+
+def tablas_escritas(query):
+    return {t.lower() for t in _RE_TABLAS_ESCRITAS.findall(query)}
+
+
+def dependencias_triggers(conn):
+    """{tabla: tablas que sus triggers modifican}, leído de sqlite_master."""
+    dependencias = defaultdict(set)
+    for (sql,) in conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger'"):
+        origen = _RE_TRIGGER_TABLA.search(sql)
+        if origen:
+            cuerpo = sql[origen.end():]
+            dependencias[origen.group(1).lower()] |= tablas_escritas(cuerpo)
+    return dict(dependencias)
+
+
+class ConnectionPool:
+    """Pool de conexiones SQLite seguro para los hilos de Streamlit."""
+
+    def __init__(self, path=DB_PATH, tamaño=8, timeout=10.0, uri=False, pragmas=PRAGMAS):
+        self.path = path
+        self.tamaño = tamaño
+        self.timeout = timeout
+        self.uri = uri
+        self.pragmas = pragmas
+        self._libres = queue.LifoQueue()
+        self._creadas = 0
+        self._lock = threading.Lock()
+
+    def _abrir(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, uri=self.uri)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    def abrir(self):
+        """Abre ya todas las conexiones que faltan (si no, se abren a pedido)."""
+        with self._lock:
+            faltan = self.tamaño - self._creadas
+            self._creadas = self.tamaño
+        for i in range(faltan):
+            try:
+                self._libres.put(self._abrir())
+            except Exception:
+                with self._lock:
+                    self._creadas -= faltan - i
+                raise
+        return self
+
+    def _tomar(self):
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._creadas < self.tamaño:
+                self._creadas += 1
+                crear = True
+            else:
+                crear = False
+        if crear:
+            try:
+                return self._abrir()
+            except Exception:
+                with self._lock:
+                    self._creadas -= 1
+                raise
+        # Pool lleno: esperar a que otro hilo devuelva una conexión
+        try:
+            return self._libres.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"pool agotado: las {self.tamaño} conexiones siguen ocupadas tras {self.timeout:g} s") from None
+
+    @contextmanager
+    def conexion(self):
+        conn = self._tomar()
+        try:
+            yield conn
+        finally:
+            # Nunca devolver al pool una transacción a medias
+            if conn.in_transaction:
+                conn.rollback()
+            self._libres.put(conn)
+
+    def cerrar(self):
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._creadas -= 1
+
+
+# ==========================================
+#     CACHÉ COMPARTIDA DE RESULTADOS
+# ==========================================
+# Resultados de lecturas por proceso (todas las sesiones la comparten), con
+# clave SQL+parámetros y etiquetadas por las tablas que leen. Cada escritura
+# invalida solo las entradas de las tablas que toca, incluidas las que
+# modifican sus triggers. El TTL cubre escrituras hechas por otros procesos.
+#
+# Cada tabla lleva además un contador de invalidaciones. Quien va a leer de la
+# base toma la marca() antes de la consulta y se la pasa a guardar(): si entre
+# medio se invalidó alguna de sus tablas, lo leído puede ser anterior a esa
+# escritura y no se guarda.
+_FALTA = object()
+
+
+class CacheConsultas:
+
+    def __init__(self, max_entradas=1024, ttl=30.0, dependencias=None):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.dependencias = dependencias or {}
+        self._entradas = OrderedDict()   # clave -> (vence, tablas, filas)
+        self._por_tabla = defaultdict(set)
+        self._generaciones = defaultdict(int)   # tabla -> invalidaciones
+        self._generacion = 0                    # vaciados completos
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.descartes = 0
+
+    def obtener(self, query, params):
+        clave = (query, tuple(params))
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    self._quitar(clave)
+                self.fallos += 1
+                return _FALTA
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return list(entrada[2])
+
+    def _marca(self, tablas):
+        return self._generacion, tuple(self._generaciones.get(t, 0) for t in sorted(tablas))
+
+    def marca(self, query):
+        """Estado de las tablas que lee `query`; tomarlo antes de consultar la base."""
+        with self._lock:
+            return self._marca(tablas_leidas(query))
+
+    def guardar(self, query, params, filas, marca=None):
+        clave = (query, tuple(params))
+        tablas = tablas_leidas(query)
+        with self._lock:
+            if marca is not None and marca != self._marca(tablas):
+                self.descartes += 1   # una escritura confirmada durante la lectura
+                return
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (time.monotonic() + self.ttl, tablas, list(filas))
+            for tabla in tablas:
+                self._por_tabla[tabla].add(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._quitar(next(iter(self._entradas)))
+
+    def _quitar(self, clave):
+        _, tablas, _ = self._entradas.pop(clave)
+        for tabla in tablas:
+            claves = self._por_tabla.get(tabla)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_tabla[tabla]
+
+    def afectadas(self, tablas):
+        # Cierre transitivo por triggers (mensajes -> conversaciones, ...)
+        pendientes, vistas = list(tablas), set()
+        while pendientes:
+            tabla = pendientes.pop()
+            if tabla not in vistas:
+                vistas.add(tabla)
+                pendientes.extend(self.dependencias.get(tabla, ()))
+        return vistas
+
+    def invalidar_escritura(self, query):
+        tablas = tablas_escritas(query)
+        if not tablas:
+            self.limpiar()
+            return
+        with self._lock:
+            for tabla in self.afectadas(tablas):
+                self._generaciones[tabla] += 1
+                for clave in list(self._por_tabla.get(tabla, ())):
+                    self._quitar(clave)
+                    self.invalidaciones += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._generacion += 1
+            self.invalidaciones += len(self._entradas)
+            self._entradas.clear()
+            self._por_tabla.clear()
+
+    def metricas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "descartes": self.descartes,
+                "tasa_aciertos": round(self.aciertos / total, 3) if total else 0.0,
+            }
+
+
+# ==========================================
+#     ESCRITOR ÚNICO CON COMMIT AGRUPADO
+# ==========================================
+# SQLite admite un solo escritor a la vez: con varias sesiones escribiendo en
+# paralelo se pelean el lock y aparecen los "database is locked". Aquí todas
+# las escrituras pasan por una cola que atiende un solo hilo. Lo que se junta
+# en la cola mientras se hace un commit va en la siguiente transacción, así
+# que con carga se paga un commit por lote y no uno por sentencia.
+def _es_ocupado(error):
+    texto = str(error).lower()
+    return "locked" in texto or "busy" in texto
+
+
+class Escritor:
+
+    def __init__(self, pool, cache=None, max_lote=64, reintentos=5, espera=0.05):
+        self.pool = pool
+        self.cache = cache
+        self.max_lote = max_lote
+        self.reintentos = reintentos
+        self.espera = espera
+        self.lotes = 0
+        self.sentencias = 0
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle, name="alba-escritor", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, query, params=(), return_data=False):
+        """Encola una escritura; el Future se resuelve tras el commit."""
+        return self.enviar_grupo([(query, params)], return_data)
+
+    def enviar_grupo(self, sentencias, return_data=False):
+        """Varias sentencias que se aplican juntas o ninguna (mismo SAVEPOINT).
+
+        Con return_data, el Future devuelve las filas de la última.
+        """
+        futuro = Future()
+        self._cola.put((tuple((q, tuple(p)) for q, p in sentencias), return_data, futuro))
+        return futuro
+
+    def _bucle(self):
+        while True:
+            lote = [self._cola.get()]
+            while lote[-1] is not None and len(lote) < self.max_lote:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            fin = lote[-1] is None
+            if fin:
+                lote.pop()
+            if lote:
+                self._procesar(lote)
+            if fin:
+                return
+
+    def _procesar(self, lote):
+        for intento in range(self.reintentos):
+            try:
+                resultados = self._aplicar(lote)
+                break
+            except sqlite3.OperationalError as e:
+                if not _es_ocupado(e) or intento == self.reintentos - 1:
+                    for *_, futuro in lote:
+                        futuro.set_exception(e)
+                    return
+                time.sleep(self.espera * 2 ** intento)
+            except Exception as e:
+                for *_, futuro in lote:
+                    futuro.set_exception(e)
+                return
+        self.lotes += 1
+        self.sentencias += len(lote)
+        # Invalidar antes de avisar: quien espera el Future ya lee lo nuevo
+        if self.cache is not None:
+            for (sentencias, *_), (_, error) in zip(lote, resultados):
+                if error is None:
+                    for query, _ in sentencias:
+                        self.cache.invalidar_escritura(query)
+        for (*_, futuro), (filas, error) in zip(lote, resultados):
+            if error is None:
+                futuro.set_result(filas)
+            else:
+                futuro.set_exception(error)
+
+    def _aplicar(self, lote):
+        # Cada envío en su SAVEPOINT: si falla (p. ej. una clave duplicada)
+        # se deshace solo ese y el resto del lote se confirma. Un lock
+        # ocupado, en cambio, hace reintentar el lote entero.
+        resultados = []
+        with self.pool.conexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for sentencias, return_data, _ in lote:
+                conn.execute("SAVEPOINT sentencia")
+                try:
+                    for query, params in sentencias:
+                        c = conn.execute(query, params)
+                    filas = c.fetchall() if return_data else None
+                except sqlite3.OperationalError as e:
+                    if _es_ocupado(e):
+                        raise
+                    conn.execute("ROLLBACK TO sentencia")
+                    resultados.append((None, e))
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO sentencia")
+                    resultados.append((None, e))
+                else:
+                    resultados.append((filas, None))
+                conn.execute("RELEASE sentencia")
+            conn.commit()
+        return resultados
+
+    def metricas(self):
+        return {
+            "lotes": self.lotes,
+            "sentencias": self.sentencias,
+            "por_lote": round(self.sentencias / self.lotes, 2) if self.lotes else 0.0,
+            "en_cola": self._cola.qsize(),
+        }
+
+    def cerrar(self, timeout=10.0):
+        self._cola.put(None)
+        self._hilo.join(timeout)
+
+
+# Funciones a las que se avisa tras cada sentencia exitosa con
+# (query, params, segundos, origen, filas), origen = "cache", "lectura" o
+# "escritura" y filas = cuántas devolvió (None si no se pidieron datos).
+# Las usan las mediciones de rendimiento; sin observadores no cuestan nada.
+OBSERVADORES = []
+
+
+def _notificar(query, params, inicio, origen, filas):
+    if OBSERVADORES:
+        segundos = time.perf_counter() - inicio
+        cantidad = len(filas) if filas is not None else None
+        for observador in list(OBSERVADORES):
+            observador(query, params, segundos, origen, cantidad)
+
+
+def ejecutar(pool, query, params=(), return_data=False, cache=None, escritor=None, origen="lectura"):
+    """Ejecuta una sentencia usando una conexión del pool.
+
+    Las lecturas no hacen commit; las escrituras sí. Con `cache`, las lecturas
+    que devuelven datos se sirven desde memoria si están y las escrituras
+    invalidan lo que corresponde. Con `escritor`, las escrituras se encolan en
+    él y se espera su commit, a lo sumo ESPERA_ESCRITURA segundos (después,
+    TimeoutError). Los errores se propagan para que quien llama decida cómo
+    mostrarlos. `origen` es la etiqueta de las lecturas para los
+    observadores ("lectura", "replica").
+    """
+    inicio = time.perf_counter()
+    lectura = es_lectura(query)
+    if escritor is not None and not lectura:
+        try:
+            filas = escritor.enviar(query, params, return_data).result(timeout=ESPERA_ESCRITURA)
+        except FuturoVencido:
+            # Sigue en la cola: puede confirmarse más tarde
+            raise TimeoutError(f"la escritura no se confirmó en {ESPERA_ESCRITURA:g} s") from None
+        _notificar(query, params, inicio, "escritura", filas)
+        return filas
+    marca = None
+    if cache is not None and lectura and return_data:
+        filas = cache.obtener(query, params)
+        if filas is not _FALTA:
+            _notificar(query, params, inicio, "cache", filas)
+            return filas
+        marca = cache.marca(query)
+    with pool.conexion() as conn:
+        c = conn.execute(query, params)
+        filas = c.fetchall() if return_data else None
+        if not lectura:
+            conn.commit()
+    if cache is not None:
+        if lectura:
+            if return_data:
+                cache.guardar(query, params, filas, marca)
+        else:
+            cache.invalidar_escritura(query)
+    _notificar(query, params, inicio, origen if lectura else "escritura", filas)
+    return filas
@@ -0,0 +1,67 @@
+# ==========================================
+#   CONTADORES DE REPUTACIÓN Y SEGUIDORES
+# ==========================================
+# estadisticas_usuario guarda por usuario la suma de estrellas, el total de
+# reseñas y los conteos de seguidores/seguidos; no_leidos, los mensajes sin
+# leer (tabla aparte: el tráfico del chat no toca lo que leen el catálogo y
+# los perfiles). Los triggers de las migraciones los mantienen al día, así
+# que leerlos es una búsqueda por clave primaria.
+# reconstruir() y verificar() recalculan todo desde cero.
+
+# Conteos calculados directamente desde las tablas de origen
+SQL_RECALCULO = """
+    SELECT email, SUM(suma_estrellas), SUM(total_resenas), SUM(seguidores), SUM(seguidos)
+    FROM (
+        SELECT calificado AS email, SUM(estrellas) AS suma_estrellas, COUNT(*) AS total_resenas,
+               0 AS seguidores, 0 AS seguidos
+        FROM resenas GROUP BY calificado
+        UNION ALL
+        SELECT seguido, 0, 0, COUNT(*), 0 FROM seguidores GROUP BY seguido
+        UNION ALL
+        SELECT seguidor, 0, 0, 0, COUNT(*) FROM seguidores GROUP BY seguidor
+    )
+    WHERE email IS NOT NULL
+    GROUP BY email
+"""
+
+COLUMNAS = ("suma_estrellas", "total_resenas", "seguidores", "seguidos")
+
+SQL_NO_LEIDOS = "SELECT destinatario, COUNT(*) FROM mensajes WHERE leido = 0 GROUP BY destinatario"
+
+
+def _tabla_no_leidos(conn):
+    # La migración 4 reconstruye antes de que exista (la crea la 5)
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'no_leidos'").fetchone() is not None
+
+
+def reconstruir(conn):
+    """Reemplaza los contadores por los recalculados. Devuelve cuántos usuarios quedaron."""
+    conn.execute("DELETE FROM estadisticas_usuario")
+    conn.execute(f"INSERT INTO estadisticas_usuario (email, {', '.join(COLUMNAS)}) {SQL_RECALCULO}")
+    if _tabla_no_leidos(conn):
+        conn.execute("DELETE FROM no_leidos")
+        conn.execute(f"INSERT INTO no_leidos (email, n) {SQL_NO_LEIDOS}")
+    return conn.execute("SELECT COUNT(*) FROM estadisticas_usuario").fetchone()[0]
+
+
+def verificar(conn):
+    """Lista de (email, guardado, calculado) para cada usuario cuyos contadores no cuadran."""
+    vacio = (0,) * len(COLUMNAS)
+    guardados = {fila[0]: tuple(fila[1:]) for fila in
+                 conn.execute(f"SELECT email, {', '.join(COLUMNAS)} FROM estadisticas_usuario")}
+    calculados = {fila[0]: tuple(fila[1:]) for fila in conn.execute(SQL_RECALCULO)}
+    if _tabla_no_leidos(conn):
+        # El contador de no leídos va al final de la tupla
+        nl_guardados = dict(conn.execute("SELECT email, n FROM no_leidos"))
+        nl_calculados = dict(conn.execute(SQL_NO_LEIDOS))
+        for email in set(guardados) | set(calculados) | set(nl_guardados) | set(nl_calculados):
+            guardados[email] = guardados.get(email, vacio) + (nl_guardados.get(email, 0),)
+            calculados[email] = calculados.get(email, vacio) + (nl_calculados.get(email, 0),)
+        vacio += (0,)
+    diferencias = []
+    for email in sorted(set(guardados) | set(calculados)):
+        guardado = guardados.get(email, vacio)
+        calculado = calculados.get(email, vacio)
+        if guardado != calculado:
+            diferencias.append((email, guardado, calculado))
+    return diferencias
@@ -0,0 +1,261 @@
+# ==========================================
+#     FEED PERSONALIZADO "PARA TI"
+# ==========================================
+# Un hilo en segundo plano mantiene feed_personalizado:
+#   - feed_nuevos: cada aviso nuevo o reactivado se puntúa una sola vez para
+#     los interesados (seguidores y misma carrera del dueño) con un INSERT ...
+#     SELECT, sin rehacer el feed de nadie.
+#   - feed_pendientes: usuarios cuyo feed hay que rehacer entero porque
+#     cambiaron sus seguidos o su carrera, y cada cierto tiempo todos, para
+#     que la recencia y la reputación se mantengan al día.
+# No pasa por el escritor de las sesiones: usa su propia conexión con una
+# transacción corta por aviso o por usuario y una pausa entre una y otra,
+# así que una escritura de un usuario espera a lo sumo una de ellas. Cada
+# proceso de Streamlit corre su propio hilo sobre las mismas colas: la
+# transacción empieza borrando la fila de la cola y, si otro proceso ya la
+# borró, se deshace sin hacer nada.
+# La página solo lee el top N ya puntuado con una consulta por índice.
+#
+# Candidatos de cada usuario: lo de sus seguidos, lo más reciente de su
+# carrera y lo más reciente en general. Puntaje = sigue al dueño + misma
+# carrera + reputación del dueño + recencia (decae con los días), menos una
+# penalización por cada aviso anterior del mismo dueño, para que un vendedor
+# con muchas publicaciones no llene el feed solo.
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+TAM_FEED = 100
+CANDIDATOS_CARRERA = 500
+CANDIDATOS_RECIENTES = 200
+PESO_SIGUE = 3.0
+PESO_CARRERA = 1.5
+PESO_REPUTACION = 1.0   # promedio de estrellas / 5
+PESO_RECIENTE = 2.0     # 1 el día de la publicación, 0.5 a los DIAS_RECIENTE días
+DIAS_RECIENTE = 7.0
+PENALIZACION_REPETIDO = 0.5
+PAUSA = 0.02            # segundos entre transacciones del hilo
+
+
+def fecha_juliana(columna):
+    # Las fechas se guardan como dd-mm-aaaa
+    return (f"julianday(substr({columna}, 7, 4) || '-' || substr({columna}, 4, 2) "
+            f"|| '-' || substr({columna}, 1, 2))")
+
+
+def _sql_feed(tabla, tipo, dueño, disponible):
+    # Parámetros: ?1 email, ?2 candidatos de la carrera, ?3 recientes, ?4 tamaño del feed
+    filtro = f"AND x.estado = 'Disponible'" if disponible else ""
+    return f"""
+        WITH yo AS (SELECT carrera FROM usuarios WHERE email = ?1),
+        candidatos AS (
+            SELECT x.id FROM seguidores s JOIN {tabla} x ON x.{dueño} = s.seguido
+            WHERE s.seguidor = ?1 {filtro}
+            UNION
+            SELECT id FROM (SELECT x.id FROM {tabla} x JOIN usuarios u ON u.email = x.{dueño}
+                            WHERE u.carrera = (SELECT carrera FROM yo) {filtro}
+                            ORDER BY x.id DESC LIMIT ?2)
+            UNION
+            SELECT id FROM (SELECT x.id FROM {tabla} x WHERE 1 {filtro} ORDER BY x.id DESC LIMIT ?3)
+        ),
+        puntuados AS (
+            SELECT x.id, x.{dueño} AS dueño,
+               {PESO_SIGUE} * EXISTS (SELECT 1 FROM seguidores WHERE seguidor = ?1 AND seguido = x.{dueño})
+             + {PESO_CARRERA} * (u.carrera IS (SELECT carrera FROM yo))
+             + {PESO_REPUTACION} * COALESCE(est.suma_estrellas * 1.0 / NULLIF(est.total_resenas, 0), 0) / 5.0
+             + {PESO_RECIENTE} * COALESCE(1.0 / (1 + max(0, julianday('now') - {fecha_juliana("x.fecha")}) / {DIAS_RECIENTE}), 0)
+               AS base
+            FROM candidatos c
+            JOIN {tabla} x ON x.id = c.id
+            JOIN usuarios u ON u.email = x.{dueño}
+            LEFT JOIN estadisticas_usuario est ON est.email = x.{dueño}
+            WHERE x.{dueño} != ?1
+        )
+        INSERT INTO feed_personalizado (email, tipo, item_id, puntaje)
+        SELECT ?1, '{tipo}', id,
+               base - {PENALIZACION_REPETIDO} * (ROW_NUMBER() OVER (PARTITION BY dueño ORDER BY base DESC) - 1)
+               AS puntaje
+        FROM puntuados
+        ORDER BY puntaje DESC LIMIT ?4
+    """
+
+
+SQL_FEED_PRODUCTOS = _sql_feed("productos", "p", "email_dueño", disponible=True)
+SQL_FEED_SOLICITUDES = _sql_feed("solicitudes", "s", "email_solicitante", disponible=False)
+
+
+def _sql_nuevo(tabla, tipo, dueño, disponible):
+    # Parámetros: ?1 id del aviso, ?2 tamaño del feed. Mismo puntaje que
+    # _sql_feed. Entre los avisos de un mismo dueño solo cambia la recencia,
+    # así que el nuevo queda primero entre los suyos y no lleva penalización;
+    # los anteriores del dueño la reciben en el próximo recálculo completo.
+    # Solo entra si supera al último del top de ese usuario.
+    filtro = f"AND estado = 'Disponible'" if disponible else ""
+    return f"""
+        WITH aviso AS (
+            SELECT x.id, x.{dueño} AS dueño, u.carrera,
+               {PESO_REPUTACION} * COALESCE(est.suma_estrellas * 1.0 / NULLIF(est.total_resenas, 0), 0) / 5.0
+             + {PESO_RECIENTE} * COALESCE(1.0 / (1 + max(0, julianday('now') - {fecha_juliana("x.fecha")}) / {DIAS_RECIENTE}), 0)
+               AS comun
+            FROM (SELECT * FROM {tabla} WHERE id = ?1 {filtro}) x
+            JOIN usuarios u ON u.email = x.{dueño}
+            LEFT JOIN estadisticas_usuario est ON est.email = x.{dueño}
+        ),
+        interesados AS (
+            SELECT s.seguidor AS email FROM aviso a JOIN seguidores s ON s.seguido = a.dueño
+            UNION
+            SELECT u.email FROM aviso a JOIN usuarios u ON u.carrera = a.carrera
+        ),
+        puntuados AS (
+            SELECT i.email, a.id,
+               a.comun
+             + {PESO_SIGUE} * EXISTS (SELECT 1 FROM seguidores WHERE seguidor = i.email AND seguido = a.dueño)
+             + {PESO_CARRERA} * (u.carrera IS a.carrera)
+               AS puntaje
+            FROM interesados i
+            JOIN aviso a
+            JOIN usuarios u ON u.email = i.email
+            WHERE i.email != a.dueño
+        )
+        INSERT INTO feed_personalizado (email, tipo, item_id, puntaje)
+        SELECT email, '{tipo}', id, puntaje FROM puntuados p
+        WHERE puntaje > COALESCE((SELECT puntaje FROM feed_personalizado
+                                  WHERE email = p.email AND tipo = '{tipo}'
+                                  ORDER BY puntaje DESC LIMIT 1 OFFSET ?2 - 1), -1e9)
+        ON CONFLICT (email, tipo, item_id) DO UPDATE SET puntaje = excluded.puntaje
+    """
+
+
+SQL_NUEVO = {
+    "p": _sql_nuevo("productos", "p", "email_dueño", disponible=True),
+    "s": _sql_nuevo("solicitudes", "s", "email_solicitante", disponible=False),
+}
+
+# Parámetros: ?1 tipo, ?2 id del aviso, ?3 tamaño. Deja en el top a quienes
+# recibieron el aviso recién puntuado.
+SQL_RECORTE = """
+    DELETE FROM feed_personalizado
+    WHERE (email, tipo, item_id) IN (
+        SELECT email, tipo, item_id FROM (
+            SELECT email, tipo, item_id, ROW_NUMBER() OVER (PARTITION BY email ORDER BY puntaje DESC) AS n
+            FROM feed_personalizado
+            WHERE tipo = ?1
+              AND email IN (SELECT email FROM feed_personalizado WHERE tipo = ?1 AND item_id = ?2))
+        WHERE n > ?3)
+"""
+
+
+# La primera sentencia de cada grupo saca la fila de su cola (ver _transaccion)
+def sentencias_usuario(email, tamaño=TAM_FEED):
+    """Sentencias que rehacen el feed de un usuario (aplicar juntas)."""
+    params = (email, CANDIDATOS_CARRERA, CANDIDATOS_RECIENTES, tamaño)
+    return [
+        ("DELETE FROM feed_pendientes WHERE email = ?", (email,)),
+        ("DELETE FROM feed_personalizado WHERE email = ?", (email,)),
+        (SQL_FEED_PRODUCTOS, params),
+        (SQL_FEED_SOLICITUDES, params),
+    ]
+
+
+def sentencias_nuevo(tipo, item_id, tamaño=TAM_FEED):
+    """Sentencias que agregan un aviso al feed de sus interesados (aplicar juntas)."""
+    return [
+        ("DELETE FROM feed_nuevos WHERE tipo = ? AND item_id = ?", (tipo, item_id)),
+        (SQL_NUEVO[tipo], (item_id, tamaño)),
+        (SQL_RECORTE, (tipo, item_id, tamaño)),
+    ]
+
+
+def marcar_todos(conn):
+    conn.execute("INSERT OR IGNORE INTO feed_pendientes (email) SELECT email FROM usuarios")
+
+
+def procesar_pendientes(conn, limite=None):
+    """Recalcula en esta conexión los feeds pendientes. Devuelve cuántos."""
+    emails = [e for (e,) in conn.execute("SELECT email FROM feed_pendientes LIMIT ?", (limite or -1,))]
+    for email in emails:
+        for query, params in sentencias_usuario(email):
+            conn.execute(query, params)
+    return len(emails)
+
+
+class ActualizadorFeed:
+    """Hilo que procesa feed_nuevos y feed_pendientes cada `intervalo` segundos."""
+
+    def __init__(self, pool, cache=None, intervalo=30.0, intervalo_completo=3600.0, por_vuelta=200,
+                 pausa=PAUSA):
+        self.pool = pool
+        self.cache = cache
+        self.intervalo = intervalo
+        self.intervalo_completo = intervalo_completo
+        self.por_vuelta = por_vuelta
+        self.pausa = pausa
+        self.puntuados = 0
+        self.recalculados = 0
+        self._proximo_completo = time.monotonic() + intervalo_completo
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="alba-feed", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def _bucle(self):
+        while True:
+            try:
+                self.vuelta()
+            except Exception:
+                log.exception("No se pudo actualizar el feed personalizado")
+            if self._parar.wait(self.intervalo):
+                return
+
+    def _transaccion(self, sentencias, reclamar=False):
+        # Una transacción corta; después se deja pasar a los escritores. Con
+        # reclamar, si la primera sentencia (el DELETE de la cola) no borró
+        # nada es porque otro proceso ya tomó la fila: se deshace y devuelve
+        # False. BEGIN IMMEDIATE hace que solo uno de los dos la borre.
+        with self.pool.conexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for i, (query, params) in enumerate(sentencias):
+                    cursor = conn.execute(query, params)
+                    if reclamar and i == 0 and cursor.rowcount == 0:
+                        conn.rollback()
+                        return False
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        if self.cache is not None:
+            for query, _ in sentencias:
+                self.cache.invalidar_escritura(query)
+        self._parar.wait(self.pausa)
+        return True
+
+    def vuelta(self):
+        """Una pasada por feed_nuevos y feed_pendientes. Devuelve (avisos puntuados, feeds rehechos)."""
+        if time.monotonic() >= self._proximo_completo:
+            self._transaccion([("INSERT OR IGNORE INTO feed_pendientes (email) SELECT email FROM usuarios", ())])
+            self._proximo_completo = time.monotonic() + self.intervalo_completo
+        with self.pool.conexion() as conn:
+            nuevos = conn.execute("SELECT tipo, item_id FROM feed_nuevos LIMIT ?", (self.por_vuelta,)).fetchall()
+            emails = [e for (e,) in conn.execute("SELECT email FROM feed_pendientes LIMIT ?", (self.por_vuelta,))]
+        puntuados = recalculados = 0
+        for tipo, item_id in nuevos:
+            if self._parar.is_set():
+                break
+            puntuados += self._transaccion(sentencias_nuevo(tipo, item_id), reclamar=True)
+        # Cada usuario en su transacción: su feed nunca se ve a medio rehacer
+        for email in emails:
+            if self._parar.is_set():
+                break
+            recalculados += self._transaccion(sentencias_usuario(email), reclamar=True)
+        self.puntuados += puntuados
+        self.recalculados += recalculados
+        return puntuados, recalculados
+
+    def detener(self, timeout=10.0):
+        self._parar.set()
+        self._hilo.join(timeout)
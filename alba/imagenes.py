@@ -0,0 +1,43 @@
+# ==========================================
+#      MINIATURAS DE FOTOS DE PRODUCTOS
+# ==========================================
+# Al publicar se generan versiones comprimidas de la foto: el catálogo solo
+# carga la miniatura y la versión mediana se pide al ampliar.
+import io
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Sin Pillow se guardan los bytes originales
+    Image = None
+
+TAMAÑO_MINIATURA = (320, 320)
+TAMAÑO_MEDIO = (1024, 1024)
+CALIDAD_JPEG = 80
+
+
+def redimensionar(datos, tamaño, calidad=CALIDAD_JPEG):
+    """Devuelve la imagen reducida a `tamaño` como JPEG, o los bytes originales si no se puede."""
+    if Image is None or not datos:
+        return datos
+    try:
+        with Image.open(io.BytesIO(datos)) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail(tamaño)
+            if img.mode in ("RGBA", "LA", "P"):
+                # PNG con transparencia: fondo blanco en vez de negro
+                img = img.convert("RGBA")
+                fondo = Image.new("RGB", img.size, "white")
+                fondo.paste(img, mask=img.getchannel("A"))
+                img = fondo
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            salida = io.BytesIO()
+            img.save(salida, "JPEG", quality=calidad, optimize=True, progressive=True)
+            return salida.getvalue()
+    except Exception:
+        return datos
+
+
+def generar_versiones(datos):
+    """(miniatura, mediana) a partir de los bytes subidos."""
+    return redimensionar(datos, TAMAÑO_MINIATURA), redimensionar(datos, TAMAÑO_MEDIO)
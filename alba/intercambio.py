@@ -0,0 +1,249 @@
+# ==========================================
+#     IMPORTACIÓN / EXPORTACIÓN MASIVA
+# ==========================================
+# Lee y escribe CSV o JSONL fila a fila: la memoria usada no depende del
+# tamaño del archivo. Las inserciones van en lotes con executemany y un
+# commit por lote, no una conexión y un commit por fila como en la app.
+# Las tablas derivadas (contadores, conversaciones, FTS, feed) las mantienen
+# los triggers de las migraciones, así que no se importan ni exportan.
+import csv
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from itertools import islice
+
+from alba import blobs, credenciales
+
+TAM_LOTE = 10_000
+FORMATOS = ("csv", "jsonl")
+
+# Columnas que se exportan, en orden. 'foto' es el nombre del archivo en la
+# carpeta de fotos; en la base se guardan los hashes del almacén de blobs.
+COLUMNAS = {
+    "usuarios": ("email", "nombre", "password", "whatsapp", "carrera", "pregunta", "respuesta"),
+    "productos": ("id", "nombre", "descripcion", "precio", "estado", "email_dueño", "fecha", "foto"),
+    "solicitudes": ("id", "titulo", "presupuesto", "descripcion", "email_solicitante", "fecha"),
+    "mensajes": ("id", "remitente", "destinatario", "mensaje", "fecha_hora", "leido"),
+    "resenas": ("id", "calificador", "calificado", "estrellas", "comentario", "fecha"),
+    "seguidores": ("seguidor", "seguido"),
+}
+
+OBLIGATORIAS = {
+    "usuarios": ("email", "nombre", "password"),
+    "productos": ("nombre", "precio", "email_dueño"),
+    "solicitudes": ("titulo", "email_solicitante"),
+    "mensajes": ("remitente", "destinatario", "mensaje"),
+    "resenas": ("calificador", "calificado", "estrellas"),
+    "seguidores": ("seguidor", "seguido"),
+}
+
+ENTEROS = {"precio", "presupuesto", "leido", "estrellas"}
+
+# Los ids los asigna la base; los que trae el archivo solo sirven de referencia
+SQL_INSERTAR = {
+    "usuarios": """INSERT OR IGNORE INTO usuarios (email, nombre, password, whatsapp, carrera, pregunta, respuesta)
+                   VALUES (?,?,?,?,?,?,?)""",
+    "productos": """INSERT INTO productos (nombre, descripcion, precio, estado, email_dueño, fecha,
+                    foto_hash, miniatura_hash, media_hash) VALUES (?,?,?,?,?,?,?,?,?)""",
+    "solicitudes": """INSERT INTO solicitudes (titulo, presupuesto, descripcion, email_solicitante, fecha)
+                      VALUES (?,?,?,?,?)""",
+    "mensajes": """INSERT INTO mensajes (remitente, destinatario, mensaje, fecha_hora, leido)
+                   VALUES (?,?,?,?,?)""",
+    "resenas": """INSERT INTO resenas (calificador, calificado, estrellas, comentario, fecha)
+                  VALUES (?,?,?,?,?)""",
+    "seguidores": "INSERT OR IGNORE INTO seguidores (seguidor, seguido) VALUES (?,?)",
+}
+
+SQL_EXPORTAR = {
+    "usuarios": "SELECT email, nombre, password, whatsapp, carrera, pregunta, respuesta FROM usuarios ORDER BY email",
+    "productos": """SELECT id, nombre, descripcion, precio, estado, email_dueño, fecha, foto_hash
+                    FROM productos ORDER BY id""",
+    "solicitudes": """SELECT id, titulo, presupuesto, descripcion, email_solicitante, fecha
+                      FROM solicitudes ORDER BY id""",
+    "mensajes": "SELECT id, remitente, destinatario, mensaje, fecha_hora, leido FROM mensajes ORDER BY id",
+    "resenas": "SELECT id, calificador, calificado, estrellas, comentario, fecha FROM resenas ORDER BY id",
+    "seguidores": "SELECT seguidor, seguido FROM seguidores ORDER BY id",
+}
+
+
+def formato_de(ruta, formato=None):
+    if formato:
+        return formato
+    extension = os.path.splitext(ruta)[1].lower().lstrip(".")
+    if extension not in FORMATOS:
+        raise ValueError(f"No se reconoce el formato de '{ruta}'; usa --formato {'/'.join(FORMATOS)}.")
+    return extension
+
+
+def abrir(ruta, modo):
+    # "-" es la entrada o salida estándar
+    if ruta == "-":
+        return sys.stdin if modo == "r" else sys.stdout
+    return open(ruta, modo, encoding="utf-8", newline="")
+
+
+# ==========================================
+#               LECTURA
+# ==========================================
+def leer_filas(archivo, formato):
+    """Itera (número de línea, dict) sin cargar el archivo completo."""
+    if formato == "csv":
+        lector = csv.DictReader(archivo)
+        for fila in lector:
+            yield lector.line_num, fila
+        return
+    for numero, linea in enumerate(archivo, start=1):
+        if linea.strip():
+            try:
+                yield numero, json.loads(linea)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"línea {numero}: JSON inválido ({e.msg})") from None
+
+
+def _valor(fila, columna):
+    valor = fila.get(columna)
+    if isinstance(valor, str):
+        valor = valor.strip()
+    if valor in ("", None):
+        return None
+    if columna in ENTEROS:
+        return int(valor)
+    return valor
+
+
+class _Preparador:
+    """Convierte cada fila leída en la tupla de parámetros de SQL_INSERTAR."""
+
+    def __init__(self, tabla, dir_fotos=None, store=None):
+        self.tabla = tabla
+        self.dir_fotos = dir_fotos
+        self.store = store
+        self.hoy = datetime.now().strftime("%d-%m-%Y")
+        self.ahora = datetime.now().strftime("%Y-%m-%d %H:%M")
+        # Una misma foto puede repetirse en muchas filas: se procesa una vez
+        self._fotos = {}
+
+    def _foto(self, nombre):
+        if not nombre:
+            return (None, None, None)
+        if self.dir_fotos is None:
+            raise ValueError(f"la fila trae foto '{nombre}' pero no se indicó --fotos")
+        if nombre not in self._fotos:
+            with open(os.path.join(self.dir_fotos, nombre), "rb") as f:
+                self._fotos[nombre] = blobs.guardar_foto(self.store, f.read())
+        return self._fotos[nombre]
+
+    def __call__(self, fila):
+        v = {c: _valor(fila, c) for c in COLUMNAS[self.tabla]}
+        faltan = [c for c in OBLIGATORIAS[self.tabla] if v[c] is None]
+        if faltan:
+            raise ValueError(f"faltan columnas obligatorias: {', '.join(faltan)}")
+        if self.tabla == "usuarios":
+            return (v["email"], v["nombre"], v["password"], v["whatsapp"], v["carrera"],
+                    v["pregunta"], v["respuesta"])
+        if self.tabla == "productos":
+            return (v["nombre"], v["descripcion"], v["precio"], v["estado"] or "Disponible",
+                    v["email_dueño"], v["fecha"] or self.hoy) + tuple(self._foto(v["foto"]))
+        if self.tabla == "solicitudes":
+            return (v["titulo"], v["presupuesto"], v["descripcion"], v["email_solicitante"],
+                    v["fecha"] or self.hoy)
+        if self.tabla == "mensajes":
+            return (v["remitente"], v["destinatario"], v["mensaje"],
+                    v["fecha_hora"] or self.ahora, v["leido"] or 0)
+        if self.tabla == "resenas":
+            return (v["calificador"], v["calificado"], v["estrellas"], v["comentario"],
+                    v["fecha"] or self.hoy)
+        return (v["seguidor"], v["seguido"])
+
+
+def _es_hash(valor):
+    return valor is None or valor.startswith("scrypt$") or credenciales.es_legado(valor)
+
+
+def _hashear_credenciales(lote):
+    # Las claves en texto plano se hashean en paralelo en el pool de KDF; las
+    # que ya vienen hasheadas (p. ej. de una exportación) se guardan tal cual
+    pendientes = []
+    for i, fila in enumerate(lote):
+        fila = list(fila)
+        if not _es_hash(fila[2]):
+            pendientes.append((i, 2, credenciales.hashear_en_pool(fila[2])))
+        if not _es_hash(fila[6]):
+            pendientes.append((i, 6, credenciales.hashear_en_pool(fila[6].lower().strip())))
+        lote[i] = fila
+    for i, columna, futuro in pendientes:
+        lote[i][columna] = futuro.result()
+    return lote
+
+
+def importar(conn, tabla, archivo, formato, dir_fotos=None, tam_lote=TAM_LOTE, avance=None):
+    """Inserta las filas del archivo en `tabla`. Devuelve cuántas filas se insertaron.
+
+    Cada lote va en su propia transacción; si una fila es inválida se aborta
+    con ValueError indicando la línea, y los lotes anteriores quedan guardados.
+    """
+    store = blobs.BlobStore(blobs.DIR_BLOBS) if tabla == "productos" else None
+    preparar = _Preparador(tabla, dir_fotos, store)
+    filas = leer_filas(archivo, formato)
+    total = 0
+    while True:
+        lote = []
+        for numero, fila in islice(filas, tam_lote):
+            try:
+                lote.append(preparar(fila))
+            except (ValueError, TypeError, OSError) as e:
+                conn.rollback()
+                raise ValueError(f"línea {numero}: {e}") from None
+        if not lote:
+            return total
+        if tabla == "usuarios":
+            lote = _hashear_credenciales(lote)
+        total += conn.executemany(SQL_INSERTAR[tabla], lote).rowcount
+        conn.commit()
+        if avance:
+            avance(total)
+
+
+# ==========================================
+#               ESCRITURA
+# ==========================================
+def _exportar_foto(store, clave, dir_fotos, escritas):
+    # El original se copia una vez por hash, con el hash como nombre (sin
+    # extensión: puede ser JPEG, PNG, ...); la fila apunta a ese archivo
+    if not clave or not store.existe(clave):
+        return None
+    if clave not in escritas:
+        destino = os.path.join(dir_fotos, clave)
+        if not os.path.exists(destino):
+            shutil.copyfile(store.ruta(clave), destino)
+        escritas.add(clave)
+    return clave
+
+
+def exportar(conn, tabla, archivo, formato, dir_fotos=None, tam_lote=TAM_LOTE):
+    """Escribe la tabla completa con un cursor leído por bloques. Devuelve cuántas filas escribió."""
+    columnas = COLUMNAS[tabla]
+    store, escritas = None, set()
+    if tabla == "productos" and dir_fotos:
+        os.makedirs(dir_fotos, exist_ok=True)
+        store = blobs.BlobStore(blobs.DIR_BLOBS)
+    if formato == "csv":
+        escritor = csv.writer(archivo)
+        escritor.writerow(columnas)
+    cursor = conn.execute(SQL_EXPORTAR[tabla])
+    total = 0
+    while True:
+        bloque = cursor.fetchmany(tam_lote)
+        if not bloque:
+            return total
+        if tabla == "productos":
+            bloque = [fila[:-1] + (_exportar_foto(store, fila[-1], dir_fotos, escritas) if store else None,)
+                      for fila in bloque]
+        if formato == "csv":
+            escritor.writerows(bloque)
+        else:
+            archivo.writelines(json.dumps(dict(zip(columnas, fila)), ensure_ascii=False) + "\n"
+                               for fila in bloque)
+        total += len(bloque)
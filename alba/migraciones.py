@@ -0,0 +1,416 @@
+# ==========================================
+#       MIGRACIONES VERSIONADAS DEL ESQUEMA
+# ==========================================
+# La versión del esquema se guarda en PRAGMA user_version. Al iniciar solo se
+# aplican las migraciones con número mayor, cada una en su propia transacción.
+# Para cambiar el esquema: agregar una entrada al final de MIGRACIONES (nunca
+# editar una que ya se haya publicado).
+from alba import blobs, estadisticas
+
+
+def _sql(*sentencias):
+    def paso(conn):
+        for sentencia in sentencias:
+            conn.execute(sentencia)
+    return paso
+
+
+def _fotos_a_blobs(conn):
+    # Devuelve True si hubo fotos movidas (conviene hacer VACUUM)
+    return blobs.migrar_fotos(conn, blobs.BlobStore(blobs.DIR_BLOBS)) > 0
+
+
+ESQUEMA_INICIAL = _sql(
+    '''CREATE TABLE IF NOT EXISTS usuarios (
+            email TEXT PRIMARY KEY,
+            nombre TEXT,
+            password TEXT,
+            whatsapp TEXT,
+            carrera TEXT,
+            pregunta TEXT,
+            respuesta TEXT)''',
+    '''CREATE TABLE IF NOT EXISTS productos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT,
+            descripcion TEXT,
+            precio INTEGER,
+            estado TEXT,
+            email_dueño TEXT,
+            fecha TEXT,
+            foto_hash TEXT,
+            miniatura_hash TEXT,
+            media_hash TEXT,
+            FOREIGN KEY(email_dueño) REFERENCES usuarios(email))''',
+    '''CREATE TABLE IF NOT EXISTS solicitudes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            titulo TEXT,
+            presupuesto INTEGER,
+            descripcion TEXT,
+            email_solicitante TEXT,
+            fecha TEXT,
+            FOREIGN KEY(email_solicitante) REFERENCES usuarios(email))''',
+    # --- TABLA MENSAJES (Columna 'leido') ---
+    '''CREATE TABLE IF NOT EXISTS mensajes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            remitente TEXT,
+            destinatario TEXT,
+            mensaje TEXT,
+            fecha_hora TEXT,
+            leido INTEGER DEFAULT 0,
+            FOREIGN KEY(remitente) REFERENCES usuarios(email),
+            FOREIGN KEY(destinatario) REFERENCES usuarios(email))''',
+    '''CREATE TABLE IF NOT EXISTS resenas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            calificador TEXT,
+            calificado TEXT,
+            estrellas INTEGER,
+            comentario TEXT,
+            fecha TEXT,
+            FOREIGN KEY(calificador) REFERENCES usuarios(email),
+            FOREIGN KEY(calificado) REFERENCES usuarios(email))''',
+    '''CREATE TABLE IF NOT EXISTS seguidores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            seguidor TEXT,
+            seguido TEXT,
+            FOREIGN KEY(seguidor) REFERENCES usuarios(email),
+            FOREIGN KEY(seguido) REFERENCES usuarios(email))''',
+)
+
+INDICES = _sql(
+    # Sidebar (no leídos) y chats
+    "CREATE INDEX IF NOT EXISTS idx_mensajes_destinatario_leido ON mensajes(destinatario, leido)",
+    "CREATE INDEX IF NOT EXISTS idx_mensajes_remitente_destinatario ON mensajes(remitente, destinatario)",
+    # Un usuario no puede seguir dos veces a otro: se limpian duplicados antes
+    '''DELETE FROM seguidores WHERE id NOT IN
+            (SELECT MIN(id) FROM seguidores GROUP BY seguidor, seguido)''',
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_seguidores_par ON seguidores(seguidor, seguido)",
+    "CREATE INDEX IF NOT EXISTS idx_seguidores_seguido ON seguidores(seguido)",
+    "CREATE INDEX IF NOT EXISTS idx_resenas_calificado ON resenas(calificado)",
+    "CREATE INDEX IF NOT EXISTS idx_resenas_calificador ON resenas(calificador, calificado)",
+    "CREATE INDEX IF NOT EXISTS idx_productos_estado_id ON productos(estado, id)",
+    "CREATE INDEX IF NOT EXISTS idx_productos_dueño ON productos(email_dueño)",
+    "CREATE INDEX IF NOT EXISTS idx_solicitudes_solicitante ON solicitudes(email_solicitante)",
+)
+
+CONTADORES = _sql(
+    '''CREATE TABLE IF NOT EXISTS estadisticas_usuario (
+            email TEXT PRIMARY KEY,
+            suma_estrellas INTEGER NOT NULL DEFAULT 0,
+            total_resenas INTEGER NOT NULL DEFAULT 0,
+            seguidores INTEGER NOT NULL DEFAULT 0,
+            seguidos INTEGER NOT NULL DEFAULT 0)''',
+    # --- Reseñas ---
+    '''CREATE TRIGGER IF NOT EXISTS resenas_contar_insert AFTER INSERT ON resenas BEGIN
+            INSERT INTO estadisticas_usuario (email, suma_estrellas, total_resenas)
+            VALUES (NEW.calificado, NEW.estrellas, 1)
+            ON CONFLICT(email) DO UPDATE SET
+                suma_estrellas = suma_estrellas + excluded.suma_estrellas,
+                total_resenas = total_resenas + 1;
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS resenas_contar_delete AFTER DELETE ON resenas BEGIN
+            UPDATE estadisticas_usuario
+            SET suma_estrellas = suma_estrellas - OLD.estrellas, total_resenas = total_resenas - 1
+            WHERE email = OLD.calificado;
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS resenas_contar_update AFTER UPDATE OF estrellas, calificado ON resenas BEGIN
+            UPDATE estadisticas_usuario
+            SET suma_estrellas = suma_estrellas - OLD.estrellas, total_resenas = total_resenas - 1
+            WHERE email = OLD.calificado;
+            INSERT INTO estadisticas_usuario (email, suma_estrellas, total_resenas)
+            VALUES (NEW.calificado, NEW.estrellas, 1)
+            ON CONFLICT(email) DO UPDATE SET
+                suma_estrellas = suma_estrellas + excluded.suma_estrellas,
+                total_resenas = total_resenas + 1;
+        END''',
+    # --- Seguidores ---
+    '''CREATE TRIGGER IF NOT EXISTS seguidores_contar_insert AFTER INSERT ON seguidores BEGIN
+            INSERT INTO estadisticas_usuario (email, seguidores) VALUES (NEW.seguido, 1)
+            ON CONFLICT(email) DO UPDATE SET seguidores = seguidores + 1;
+            INSERT INTO estadisticas_usuario (email, seguidos) VALUES (NEW.seguidor, 1)
+            ON CONFLICT(email) DO UPDATE SET seguidos = seguidos + 1;
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS seguidores_contar_delete AFTER DELETE ON seguidores BEGIN
+            UPDATE estadisticas_usuario SET seguidores = seguidores - 1 WHERE email = OLD.seguido;
+            UPDATE estadisticas_usuario SET seguidos = seguidos - 1 WHERE email = OLD.seguidor;
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS seguidores_contar_update AFTER UPDATE OF seguidor, seguido ON seguidores BEGIN
+            UPDATE estadisticas_usuario SET seguidores = seguidores - 1 WHERE email = OLD.seguido;
+            UPDATE estadisticas_usuario SET seguidos = seguidos - 1 WHERE email = OLD.seguidor;
+            INSERT INTO estadisticas_usuario (email, seguidores) VALUES (NEW.seguido, 1)
+            ON CONFLICT(email) DO UPDATE SET seguidores = seguidores + 1;
+            INSERT INTO estadisticas_usuario (email, seguidos) VALUES (NEW.seguidor, 1)
+            ON CONFLICT(email) DO UPDATE SET seguidos = seguidos + 1;
+        END''',
+)
+
+
+def _contadores(conn):
+    CONTADORES(conn)
+    estadisticas.reconstruir(conn)
+
+
+# Tabla propia y no una columna de estadisticas_usuario: el tráfico del chat
+# no invalida en la caché lo que leen el catálogo y los perfiles.
+NO_LEIDOS = _sql(
+    "CREATE TABLE IF NOT EXISTS no_leidos (email TEXT PRIMARY KEY, n INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID",
+    '''CREATE TRIGGER IF NOT EXISTS mensajes_no_leidos_insert AFTER INSERT ON mensajes
+        WHEN NEW.leido = 0 BEGIN
+            INSERT INTO no_leidos (email, n) VALUES (NEW.destinatario, 1)
+            ON CONFLICT(email) DO UPDATE SET n = n + 1;
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS mensajes_no_leidos_delete AFTER DELETE ON mensajes
+        WHEN OLD.leido = 0 BEGIN
+            UPDATE no_leidos SET n = n - 1 WHERE email = OLD.destinatario;
+        END''',
+    # "marcar como leídos" y cualquier otro cambio de leido/destinatario
+    '''CREATE TRIGGER IF NOT EXISTS mensajes_no_leidos_update AFTER UPDATE OF leido, destinatario ON mensajes
+        WHEN (OLD.leido IS 0) != (NEW.leido IS 0) OR OLD.destinatario IS NOT NEW.destinatario BEGIN
+            UPDATE no_leidos SET n = n - (OLD.leido IS 0) WHERE email = OLD.destinatario;
+            INSERT INTO no_leidos (email, n) VALUES (NEW.destinatario, NEW.leido IS 0)
+            ON CONFLICT(email) DO UPDATE SET n = n + excluded.n;
+        END''',
+)
+
+
+def _no_leidos(conn):
+    NO_LEIDOS(conn)
+    estadisticas.reconstruir(conn)
+
+
+# --- ÍNDICE DE CONVERSACIONES (bandeja de entrada) ---
+# Una fila por par de usuarios, con usuario_a < usuario_b. no_leidos_a son los
+# mensajes sin leer que tiene usuario_a en ese hilo (y lo mismo para b).
+# retencion_lote guarda los ids que se están archivando (ver alba/retencion.py);
+# solo tiene filas dentro de la transacción de un lote. Un mensaje archivado no
+# borra su fila de conversaciones: el hilo sigue en la bandeja y el historial
+# se lee del archivo.
+CONVERSACIONES = _sql(
+    '''CREATE TABLE IF NOT EXISTS conversaciones (
+            usuario_a TEXT NOT NULL,
+            usuario_b TEXT NOT NULL,
+            ultimo_id INTEGER,
+            ultima_fecha TEXT,
+            extracto TEXT,
+            no_leidos_a INTEGER NOT NULL DEFAULT 0,
+            no_leidos_b INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (usuario_a, usuario_b))''',
+    "CREATE INDEX IF NOT EXISTS idx_conversaciones_a ON conversaciones(usuario_a, ultimo_id)",
+    "CREATE INDEX IF NOT EXISTS idx_conversaciones_b ON conversaciones(usuario_b, ultimo_id)",
+    '''INSERT INTO conversaciones (usuario_a, usuario_b, ultimo_id, ultima_fecha, extracto, no_leidos_a, no_leidos_b)
+        SELECT g.a, g.b, m.id, m.fecha_hora, substr(m.mensaje, 1, 80), g.na, g.nb
+        FROM (SELECT min(remitente, destinatario) AS a, max(remitente, destinatario) AS b, MAX(id) AS ultimo,
+                     SUM(leido IS 0 AND destinatario < remitente) AS na,
+                     SUM(leido IS 0 AND destinatario > remitente) AS nb
+              FROM mensajes GROUP BY a, b) g
+        JOIN mensajes m ON m.id = g.ultimo''',
+    '''CREATE TRIGGER IF NOT EXISTS mensajes_conversacion_insert AFTER INSERT ON mensajes BEGIN
+            INSERT INTO conversaciones (usuario_a, usuario_b, ultimo_id, ultima_fecha, extracto, no_leidos_a, no_leidos_b)
+            VALUES (min(NEW.remitente, NEW.destinatario), max(NEW.remitente, NEW.destinatario),
+                    NEW.id, NEW.fecha_hora, substr(NEW.mensaje, 1, 80),
+                    NEW.leido IS 0 AND NEW.destinatario < NEW.remitente,
+                    NEW.leido IS 0 AND NEW.destinatario > NEW.remitente)
+            ON CONFLICT(usuario_a, usuario_b) DO UPDATE SET
+                ultimo_id = excluded.ultimo_id,
+                ultima_fecha = excluded.ultima_fecha,
+                extracto = excluded.extracto,
+                no_leidos_a = no_leidos_a + excluded.no_leidos_a,
+                no_leidos_b = no_leidos_b + excluded.no_leidos_b;
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS mensajes_conversacion_leido AFTER UPDATE OF leido ON mensajes
+        WHEN (OLD.leido IS 0) != (NEW.leido IS 0) BEGIN
+            UPDATE conversaciones SET no_leidos_a = no_leidos_a + (NEW.leido IS 0) - (OLD.leido IS 0)
+            WHERE usuario_a = NEW.destinatario AND usuario_b = NEW.remitente;
+            UPDATE conversaciones SET no_leidos_b = no_leidos_b + (NEW.leido IS 0) - (OLD.leido IS 0)
+            WHERE usuario_b = NEW.destinatario AND usuario_a = NEW.remitente;
+        END''',
+    "CREATE TABLE IF NOT EXISTS retencion_lote (id INTEGER PRIMARY KEY)",
+    # Al borrar: descontar no leídos y, si era el último mensaje, apuntar al anterior
+    '''CREATE TRIGGER IF NOT EXISTS mensajes_conversacion_delete AFTER DELETE ON mensajes BEGIN
+            UPDATE conversaciones SET no_leidos_a = no_leidos_a - (OLD.leido IS 0)
+            WHERE usuario_a = OLD.destinatario AND usuario_b = OLD.remitente;
+            UPDATE conversaciones SET no_leidos_b = no_leidos_b - (OLD.leido IS 0)
+            WHERE usuario_b = OLD.destinatario AND usuario_a = OLD.remitente;
+            UPDATE conversaciones SET
+                ultimo_id = m.id, ultima_fecha = m.fecha_hora, extracto = substr(m.mensaje, 1, 80)
+            FROM (SELECT id, fecha_hora, mensaje FROM mensajes
+                  WHERE (remitente = OLD.remitente AND destinatario = OLD.destinatario)
+                     OR (remitente = OLD.destinatario AND destinatario = OLD.remitente)
+                  ORDER BY id DESC LIMIT 1) AS m
+            WHERE usuario_a = min(OLD.remitente, OLD.destinatario)
+              AND usuario_b = max(OLD.remitente, OLD.destinatario)
+              AND ultimo_id = OLD.id;
+            DELETE FROM conversaciones
+            WHERE usuario_a = min(OLD.remitente, OLD.destinatario)
+              AND usuario_b = max(OLD.remitente, OLD.destinatario)
+              AND ultimo_id = OLD.id
+              AND OLD.id NOT IN (SELECT id FROM retencion_lote);
+        END''',
+)
+
+# --- BÚSQUEDA DE TEXTO COMPLETO (FTS5) ---
+# Tablas de contenido externo: el texto vive en productos/solicitudes y el
+# índice se sincroniza con triggers. remove_diacritics hace que "cámara" y
+# "camara" coincidan.
+def _fts(tabla, columnas):
+    lista = ", ".join(columnas)
+    nuevos = ", ".join(f"NEW.{c}" for c in columnas)
+    viejos = ", ".join(f"OLD.{c}" for c in columnas)
+    return (
+        f'''CREATE VIRTUAL TABLE IF NOT EXISTS {tabla}_fts USING fts5(
+                {lista}, content='{tabla}', content_rowid='id',
+                tokenize="unicode61 remove_diacritics 2")''',
+        f"INSERT INTO {tabla}_fts({tabla}_fts) VALUES ('rebuild')",
+        f'''CREATE TRIGGER IF NOT EXISTS {tabla}_fts_insert AFTER INSERT ON {tabla} BEGIN
+                INSERT INTO {tabla}_fts(rowid, {lista}) VALUES (NEW.id, {nuevos});
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {tabla}_fts_delete AFTER DELETE ON {tabla} BEGIN
+                INSERT INTO {tabla}_fts({tabla}_fts, rowid, {lista}) VALUES ('delete', OLD.id, {viejos});
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {tabla}_fts_update AFTER UPDATE OF {lista} ON {tabla} BEGIN
+                INSERT INTO {tabla}_fts({tabla}_fts, rowid, {lista}) VALUES ('delete', OLD.id, {viejos});
+                INSERT INTO {tabla}_fts(rowid, {lista}) VALUES (NEW.id, {nuevos});
+            END''',
+    )
+
+
+BUSQUEDA = _sql(
+    *_fts("productos", ("nombre", "descripcion")),
+    *_fts("solicitudes", ("titulo", "descripcion")),
+    # Filtros de precio/presupuesto
+    "CREATE INDEX IF NOT EXISTS idx_productos_estado_precio ON productos(estado, precio)",
+    "CREATE INDEX IF NOT EXISTS idx_solicitudes_presupuesto ON solicitudes(presupuesto)",
+)
+
+# --- FEED PERSONALIZADO ("Para ti") ---
+# feed_personalizado guarda, por usuario, los avisos y solicitudes mejor
+# puntuados; lo llena alba.feed en segundo plano. Los triggers solo anotan
+# trabajo: en feed_pendientes a quién hay que recalcular entero porque
+# cambiaron sus seguidos o su carrera, y en feed_nuevos cada aviso nuevo o
+# reactivado, que el hilo puntúa una vez para sus interesados.
+FEED = _sql(
+    '''CREATE TABLE IF NOT EXISTS feed_personalizado (
+            email TEXT NOT NULL,
+            tipo TEXT NOT NULL,              -- 'p' producto, 's' solicitud
+            item_id INTEGER NOT NULL,
+            puntaje REAL NOT NULL,
+            PRIMARY KEY (email, tipo, item_id)) WITHOUT ROWID''',
+    "CREATE INDEX IF NOT EXISTS idx_feed_puntaje ON feed_personalizado(email, tipo, puntaje DESC)",
+    "CREATE TABLE IF NOT EXISTS feed_pendientes (email TEXT PRIMARY KEY) WITHOUT ROWID",
+    '''CREATE TABLE IF NOT EXISTS feed_nuevos (
+            tipo TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            PRIMARY KEY (tipo, item_id)) WITHOUT ROWID''',
+    "CREATE INDEX IF NOT EXISTS idx_usuarios_carrera ON usuarios(carrera)",
+    "INSERT OR IGNORE INTO feed_pendientes (email) SELECT email FROM usuarios",
+    '''CREATE TRIGGER IF NOT EXISTS usuarios_feed_insert AFTER INSERT ON usuarios BEGIN
+            INSERT OR IGNORE INTO feed_pendientes (email) VALUES (NEW.email);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS usuarios_feed_carrera AFTER UPDATE OF carrera ON usuarios BEGIN
+            INSERT OR IGNORE INTO feed_pendientes (email) VALUES (NEW.email);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS seguidores_feed_insert AFTER INSERT ON seguidores BEGIN
+            INSERT OR IGNORE INTO feed_pendientes (email) VALUES (NEW.seguidor);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS seguidores_feed_delete AFTER DELETE ON seguidores BEGIN
+            INSERT OR IGNORE INTO feed_pendientes (email) VALUES (OLD.seguidor);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS productos_feed_insert AFTER INSERT ON productos
+        WHEN NEW.estado = 'Disponible' BEGIN
+            INSERT OR IGNORE INTO feed_nuevos (tipo, item_id) VALUES ('p', NEW.id);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS productos_feed_estado AFTER UPDATE OF estado ON productos
+        WHEN NEW.estado = 'Disponible' AND OLD.estado IS NOT 'Disponible' BEGIN
+            INSERT OR IGNORE INTO feed_nuevos (tipo, item_id) VALUES ('p', NEW.id);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS solicitudes_feed_insert AFTER INSERT ON solicitudes BEGIN
+            INSERT OR IGNORE INTO feed_nuevos (tipo, item_id) VALUES ('s', NEW.id);
+        END''',
+)
+
+# --- RETENCIÓN (ver alba/retencion.py) ---
+# La retención archiva productos pausados o vendidos según cuánto llevan así
+# (fecha_estado), no según cuándo se publicaron; los que ya estaban pausados
+# empiezan a contar desde la migración. auto_vacuum incremental necesita un
+# VACUUM completo, una vez: lo hace 'python -m alba' (ver vacuum_completo), no
+# la app.
+FECHA_ESTADO = _sql(
+    "ALTER TABLE productos ADD COLUMN fecha_estado TEXT",
+    "UPDATE productos SET fecha_estado = datetime('now') WHERE estado != 'Disponible'",
+    '''CREATE TRIGGER IF NOT EXISTS productos_fecha_estado_insert AFTER INSERT ON productos
+        WHEN NEW.estado != 'Disponible' AND NEW.fecha_estado IS NULL BEGIN
+            UPDATE productos SET fecha_estado = datetime('now') WHERE id = NEW.id;
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS productos_fecha_estado_update AFTER UPDATE OF estado ON productos
+        WHEN OLD.estado IS NOT NEW.estado BEGIN
+            UPDATE productos SET fecha_estado = datetime('now') WHERE id = NEW.id;
+        END''',
+)
+
+
+def _retencion(conn):
+    FECHA_ESTADO(conn)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        return True
+    return False
+
+
+# (versión, descripción, paso)
+MIGRACIONES = [
+    (1, "esquema inicial", ESQUEMA_INICIAL),
+    (2, "fotos de productos al almacén de blobs", _fotos_a_blobs),
+    (3, "índices y unicidad de seguidores", INDICES),
+    (4, "contadores de reputación y seguidores", _contadores),
+    (5, "contador de mensajes no leídos", _no_leidos),
+    (6, "índice de conversaciones para la bandeja", CONVERSACIONES),
+    (7, "búsqueda de texto completo en productos y solicitudes", BUSQUEDA),
+    (8, "feed personalizado precalculado", FEED),
+    (9, "archivo de filas antiguas y vacuum incremental", _retencion),
+]
+
+
+def version_actual(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def falta_vacuum(conn):
+    """True si la base aún no tiene el auto_vacuum incremental de la migración 9."""
+    return version_actual(conn) >= 9 and conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+
+
+def vacuum_completo(conn):
+    # Reescribe toda la base y bloquea a los escritores mientras dura
+    if falta_vacuum(conn):
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def migrar(conn, migraciones=MIGRACIONES, vacuum=True):
+    """Aplica las migraciones pendientes. Devuelve la lista de versiones aplicadas.
+
+    Con vacuum=False no se hace el VACUUM completo que piden algunas
+    migraciones; queda para la próxima vez que corra 'python -m alba'.
+    """
+    aplicadas = []
+    pedido = False
+    for version, descripcion, paso in migraciones:
+        if version <= version_actual(conn):
+            continue
+        # BEGIN IMMEDIATE: si dos procesos arrancan a la vez, el segundo espera
+        # y luego ve la versión ya aplicada
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if version <= version_actual(conn):
+                conn.rollback()
+                continue
+            if paso(conn):
+                pedido = True
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        aplicadas.append(version)
+    if vacuum and (pedido or falta_vacuum(conn)):
+        vacuum_completo(conn)
+    return aplicadas
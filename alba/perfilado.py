@@ -0,0 +1,158 @@
+# ==========================================
+#     INSTRUMENTACIÓN DE CONSULTAS
+# ==========================================
+# Observador de db.ejecutar que anota cada sentencia: SQL normalizado,
+# duración, filas devueltas, origen (caché/lectura/réplica/escritura),
+# página y la llamada que la pidió (módulo.función:línea). Guarda un
+# historial circular para todo el proceso (exportable a CSV) y los totales de
+# la ejecución actual de cada sesión. Los callbacks y los refrescos de un
+# fragmento no pasan por app.py: se anotan aparte (ver aparte()) y no en la
+# última ejecución completa.
+# A las consultas lentas se les captura el EXPLAIN QUERY PLAN una vez.
+import contextlib
+import contextvars
+import csv
+import io
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from alba import db
+
+UMBRAL_LENTA_MS = float(os.environ.get("ALBA_CONSULTA_LENTA_MS", 100))
+COLUMNAS = ["hora", "pagina", "llamada", "origen", "ms", "filas", "sql", "plan"]
+
+_RE_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_ESPACIOS = re.compile(r"\s+")
+# Módulos que solo transportan la consulta: la llamada se atribuye a quien los usa
+_PLOMERIA = {os.path.join(os.path.dirname(os.path.abspath(__file__)), m) for m in ("db.py", "perfilado.py", "recursos.py")}
+
+_rerun = contextvars.ContextVar("rerun_alba", default=None)
+
+
+def normalizar(query):
+    """SQL en una línea y con los literales cambiados por '?'."""
+    query = _RE_TEXTO.sub("?", query)
+    query = _RE_NUMERO.sub("?", query)
+    return _RE_ESPACIOS.sub(" ", query).strip()
+
+
+def administradores():
+    return {e.strip().lower() for e in os.environ.get("ALBA_ADMINS", "").split(",") if e.strip()}
+
+
+def _llamada():
+    # Primer marco fuera de la plomería: "modulo.funcion:línea" o "pagina:línea"
+    marco = sys._getframe(3)
+    while marco is not None:
+        codigo = marco.f_code
+        if codigo.co_filename not in _PLOMERIA:
+            modulo = os.path.splitext(os.path.basename(codigo.co_filename))[0]
+            if codigo.co_name == "<module>":
+                return f"{modulo}:{marco.f_lineno}"
+            return f"{modulo}.{codigo.co_name}:{marco.f_lineno}"
+        marco = marco.f_back
+    return ""
+
+
+class Rerun:
+    """Consultas de una ejecución del script (una sesión, un rerun)."""
+
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.registros = []
+
+    def totales(self):
+        por_origen = {"cache": 0, "lectura": 0, "replica": 0, "escritura": 0}
+        for r in self.registros:
+            por_origen[r["origen"]] += 1
+        return {
+            "consultas": len(self.registros),
+            "ms_bd": round(sum(r["ms"] for r in self.registros), 2),
+            "ms_total": round((time.perf_counter() - self.inicio) * 1000, 2),
+            **por_origen,
+        }
+
+
+def iniciar_rerun(pagina):
+    rerun = Rerun(pagina)
+    _rerun.set(rerun)
+    return rerun
+
+
+def rerun_actual():
+    return _rerun.get()
+
+
+@contextlib.contextmanager
+def aparte(etiqueta):
+    """Anota las consultas del bloque bajo `etiqueta` (p. ej. "fragmento panel_chat")."""
+    token = _rerun.set(Rerun(etiqueta))
+    try:
+        yield
+    finally:
+        _rerun.reset(token)
+
+
+class RegistroConsultas:
+
+    def __init__(self, pool, max_registros=5000, umbral_ms=UMBRAL_LENTA_MS):
+        self.pool = pool
+        self.umbral_ms = umbral_ms
+        self._historial = deque(maxlen=max_registros)
+        self._planes = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, query, params, segundos, origen, filas):
+        rerun = _rerun.get()
+        sql = normalizar(query)
+        ms = segundos * 1000
+        registro = {
+            "hora": datetime.now().strftime("%H:%M:%S"),
+            "pagina": rerun.pagina if rerun else "",
+            "llamada": _llamada(),
+            "origen": origen,
+            "ms": round(ms, 3),
+            "filas": filas,
+            "sql": sql,
+            "plan": self._plan(sql, query, params) if ms >= self.umbral_ms and origen != "cache" else "",
+        }
+        with self._lock:
+            self._historial.append(registro)
+        if rerun is not None:
+            rerun.registros.append(registro)
+
+    def _plan(self, sql, query, params):
+        if sql not in self._planes:
+            try:
+                with self.pool.conexion() as conn:
+                    pasos = conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+                self._planes[sql] = " | ".join(paso[-1] for paso in pasos)
+            except Exception as e:
+                self._planes[sql] = f"(sin plan: {e})"
+        return self._planes[sql]
+
+    def historial(self):
+        with self._lock:
+            return list(self._historial)
+
+    def lentas(self):
+        return [r for r in self.historial() if r["plan"]]
+
+    def exportar_csv(self):
+        salida = io.StringIO()
+        escritor = csv.DictWriter(salida, fieldnames=COLUMNAS)
+        escritor.writeheader()
+        escritor.writerows(self.historial())
+        return salida.getvalue()
+
+    def activar(self):
+        if self not in db.OBSERVADORES:
+            db.OBSERVADORES.append(self)
+        return self
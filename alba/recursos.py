@@ -0,0 +1,142 @@
+# ==========================================
+#     RECURSOS COMPARTIDOS DEL PROCESO
+# ==========================================
+# Pool de conexiones, caché de lecturas, escritor único, almacén de fotos y
+# registro de consultas. Se crean una sola vez por proceso (st.cache_resource)
+# y los comparten todas las páginas y sesiones.
+import os
+import time
+
+import streamlit as st
+
+from alba import blobs, db, feed, migraciones, perfilado, replica, respaldo, retencion
+
+
+@st.cache_resource
+def get_pool():
+    return db.ConnectionPool(db.DB_PATH)
+
+
+@st.cache_resource
+def get_blobs():
+    return blobs.BlobStore(blobs.DIR_BLOBS)
+
+
+# Las migraciones corren una sola vez por proceso, no en cada rerun. Sin el
+# VACUUM completo: bloquearía a todos los usuarios; lo hace 'python -m alba'
+@st.cache_resource
+def init_db():
+    with get_pool().conexion() as conn:
+        migraciones.migrar(conn, vacuum=False)
+
+
+# Caché de lecturas compartida por todas las sesiones del proceso
+@st.cache_resource
+def get_cache():
+    init_db()   # las dependencias salen de los triggers de las migraciones
+    with get_pool().conexion() as conn:
+        return db.CacheConsultas(max_entradas=int(os.environ.get("ALBA_CACHE_ENTRADAS", 1024)),
+                                 dependencias=db.dependencias_triggers(conn))
+
+
+# Todas las escrituras del proceso pasan por un único hilo escritor
+@st.cache_resource
+def get_escritor():
+    return db.Escritor(get_pool(), cache=get_cache())
+
+
+# Anota cada consulta (ver panel de depuración)
+@st.cache_resource
+def get_registro():
+    return perfilado.RegistroConsultas(get_pool()).activar()
+
+
+# Recalcula en segundo plano el feed "Para ti" de quien lo necesite
+@st.cache_resource
+def get_actualizador_feed():
+    init_db()   # usa feed_nuevos
+    return feed.ActualizadorFeed(get_pool(), get_cache()).iniciar()
+
+
+# Respaldos periódicos dentro de la app (ALBA_RESPALDO_HORAS); por defecto
+# apagados: con varios procesos conviene un cron con 'python -m alba respaldo'
+@st.cache_resource
+def get_respaldos():
+    horas = float(os.environ.get("ALBA_RESPALDO_HORAS", 0))
+    if horas <= 0:
+        return None
+    return respaldo.ProgramadorRespaldos(db.DB_PATH, horas * 3600).iniciar()
+
+
+# Solo lectura del archivo (ver alba/retencion.py); lo llena 'python -m alba retencion'
+@st.cache_resource
+def get_pool_archivo():
+    return db.ConnectionPool(replica.uri(retencion.RUTA_ARCHIVO), tamaño=2, uri=True,
+                             pragmas=replica.PRAGMAS_LECTURA)
+
+
+def hay_archivo():
+    return os.path.exists(retencion.RUTA_ARCHIVO)
+
+
+def leer_archivo(query, params=()):
+    if not hay_archivo():
+        return []
+    try:
+        return db.ejecutar(get_pool_archivo(), query, params, return_data=True)
+    except Exception as e:
+        st.error(f"Error en el archivo: {e}")
+    return []
+
+
+# Réplica de lectura (ALBA_REPLICA, ver alba/replica.py); None si no hay
+@st.cache_resource
+def get_replica():
+    if not replica.MODO:
+        return None
+    init_db()   # la copia debe tener el esquema al día
+    if replica.MODO == "ro":
+        return replica.SoloLectura(db.DB_PATH)
+    return replica.Replica(db.DB_PATH, replica.MODO, cache=get_cache_replica()).iniciar()
+
+
+# Caché propia de la réplica: sus datos solo cambian al refrescarla. Compartir
+# la de la principal dejaría que una lectura atrasada tape una escritura.
+@st.cache_resource
+def get_cache_replica():
+    if replica.MODO == "ro":
+        return get_cache()
+    return db.CacheConsultas(max_entradas=int(os.environ.get("ALBA_CACHE_ENTRADAS", 1024)))
+
+
+def _leer_de_replica():
+    # La sesión ve sus propias escrituras: mientras la réplica sea anterior a
+    # la última, se lee de la principal
+    rep = get_replica()
+    if rep is None:
+        return None
+    escrita = st.session_state.get("ultima_escritura")
+    return rep if escrita is None or rep.instante > escrita else None
+
+
+def run_query(query, params=(), return_data=False, replica=False, cache=True):
+    # replica=True: lectura que puede salir de la réplica si está configurada
+    # cache=False: lectura que debe ver lo que otros procesos acaban de escribir
+    try:
+        rep = _leer_de_replica() if replica else None
+        if rep is not None:
+            return db.ejecutar(rep, query, params, return_data, cache=get_cache_replica(), origen="replica")
+        filas = db.ejecutar(get_pool(), query, params, return_data,
+                            cache=get_cache() if cache else None, escritor=get_escritor())
+        if not db.es_lectura(query):
+            st.session_state["ultima_escritura"] = time.monotonic()
+        return filas
+    except Exception as e:
+        st.error(f"Error en BD: {e}")
+    return None
+
+
+def ruta_foto(clave):
+    # st.image lee el archivo directo del almacén, sin pasar por la BD
+    store = get_blobs()
+    return store.ruta(clave) if store.existe(clave) else None
@@ -0,0 +1,145 @@
+# ==========================================
+#        RÉPLICA DE LECTURA (OPCIONAL)
+# ==========================================
+# Con ALBA_REPLICA las lecturas que toleran unos segundos de atraso (catálogo,
+# muro, perfiles) no usan la base principal:
+#   ALBA_REPLICA=ro            conexiones mode=ro sobre el mismo archivo
+#   ALBA_REPLICA=<ruta.db>     copia local que se rehace cada
+#                              ALBA_REPLICA_SEGUNDOS con la API de backup
+# Cada refresco escribe un archivo propio, <ruta.db>.<pid>.<n>, que nadie más
+# toca después: sus conexiones se abren con immutable=1 (sin locks ni
+# chequeos de cambios). Con un nombre compartido, otro proceso podría
+# reemplazarlo por una copia más vieja antes de que este abriera sus
+# conexiones. El pool nuevo se abre entero antes de publicarlo; las
+# conexiones en uso del anterior siguen leyendo su archivo hasta devolverse, y
+# ese archivo se borra en cuanto se puede.
+#
+# Escrituras, chat, bandeja y listas propias siguen yendo a la principal, y
+# una sesión que acaba de escribir lee de la principal hasta que haya una
+# copia posterior a su escritura (ver recursos.run_query).
+import atexit
+import itertools
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+
+from alba import db, respaldo
+
+log = logging.getLogger(__name__)
+
+MODO = os.environ.get("ALBA_REPLICA", "")
+INTERVALO = float(os.environ.get("ALBA_REPLICA_SEGUNDOS", 60))
+
+_NUMERO = itertools.count()   # numera las copias de este proceso
+
+# Sin journal_mode: una conexión de solo lectura no puede cambiarlo
+PRAGMAS_LECTURA = (
+    "PRAGMA query_only=1",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def uri(ruta, inmutable=False):
+    return f"file:{quote(os.path.abspath(ruta))}?mode=ro" + ("&immutable=1" if inmutable else "")
+
+
+class SoloLectura:
+    """Pool mode=ro sobre la base principal: siempre al día."""
+
+    def __init__(self, ruta_db, tamaño=8):
+        self.pool = db.ConnectionPool(uri(ruta_db), tamaño, uri=True, pragmas=PRAGMAS_LECTURA)
+        self.instante = math.inf
+
+    def conexion(self):
+        return self.pool.conexion()
+
+
+class Replica:
+    """Pool de lectura sobre una copia local de la base, rehecha cada `intervalo` segundos."""
+
+    def __init__(self, ruta_db, ruta_replica, intervalo=INTERVALO, tamaño=8, cache=None):
+        self.ruta_db = ruta_db
+        self.ruta_replica = ruta_replica
+        self.intervalo = intervalo
+        self.tamaño = tamaño
+        self.cache = cache
+        self.pool = None
+        self.archivo = None
+        self._viejos = []   # archivos de refrescos anteriores aún sin borrar
+        # time.monotonic() al empezar la copia vigente: todo lo confirmado
+        # antes de ese momento está en la réplica
+        self.instante = -math.inf
+        self.refrescos = 0
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="alba-replica", daemon=True)
+
+    def iniciar(self):
+        self.refrescar()
+        self._hilo.start()
+        atexit.register(self.detener, 0)   # sin copias huérfanas al salir
+        return self
+
+    def refrescar(self):
+        archivo = f"{self.ruta_replica}.{os.getpid()}.{next(_NUMERO)}"
+        instante = time.monotonic()
+        pool = None
+        origen = sqlite3.connect(self.ruta_db, timeout=10.0)
+        try:
+            respaldo.copiar(origen, archivo)
+            pool = db.ConnectionPool(uri(archivo, inmutable=True), self.tamaño,
+                                     uri=True, pragmas=PRAGMAS_LECTURA).abrir()
+        except BaseException:
+            if pool is not None:
+                pool.cerrar()
+            self._borrar(archivo)
+            raise
+        finally:
+            origen.close()
+        viejo, self.pool = self.pool, pool
+        if self.archivo is not None:
+            self._viejos.append(self.archivo)
+        self.archivo = archivo
+        self.instante = instante
+        if self.cache is not None:
+            self.cache.limpiar()
+        if viejo is not None:
+            viejo.cerrar()   # las que están en uso se liberan junto con el pool viejo
+        # En Windows falla mientras quede una conexión abierta; se reintenta
+        # en el siguiente refresco
+        self._viejos = [ruta for ruta in self._viejos if not self._borrar(ruta)]
+        self.refrescos += 1
+
+    @staticmethod
+    def _borrar(ruta):
+        try:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            return True
+        except OSError:
+            return False
+
+    def conexion(self):
+        return self.pool.conexion()
+
+    def _bucle(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.refrescar()
+            except Exception:
+                log.exception("No se pudo refrescar la réplica %s", self.ruta_replica)
+
+    def detener(self, timeout=10.0):
+        self._parar.set()
+        if self._hilo.is_alive():
+            self._hilo.join(timeout)
+        if self.pool is not None:
+            self.pool.cerrar()
+        for ruta in self._viejos + [self.archivo]:
+            if ruta is not None:
+                self._borrar(ruta)
@@ -0,0 +1,166 @@
+# ==========================================
+#        RESPALDOS EN CALIENTE DE LA BASE
+# ==========================================
+# Copia con la API de backup de SQLite, de a PAGINAS_POR_PASO páginas con una
+# pausa entre pasos, sin detener a la app. La copia se hace dentro de una
+# transacción de lectura: con WAL los escritores siguen trabajando y la
+# instantánea no cambia a mitad de camino (sin ella, cada commit ajeno
+# reinicia el backup desde la primera página).
+#
+# Cada respaldo se escribe a un archivo temporal, se verifica con
+# integrity_check, opcionalmente se comprime con gzip y recién entonces se
+# renombra; en la carpeta solo quedan respaldos completos. Se conservan los
+# CONSERVAR más recientes.
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+DIR_RESPALDOS = os.environ.get("ALBA_RESPALDOS", "respaldos")
+PAGINAS_POR_PASO = 256
+PAUSA = 0.05             # segundos entre pasos
+CONSERVAR = int(os.environ.get("ALBA_RESPALDOS_CONSERVAR", 7))
+FORMATO_FECHA = "%Y%m%d-%H%M%S"
+
+
+class RespaldoInvalido(Exception):
+    pass
+
+
+def _prefijo(ruta_db):
+    return os.path.splitext(os.path.basename(ruta_db))[0] + "-"
+
+
+def copiar(origen, destino, paginas=PAGINAS_POR_PASO, pausa=PAUSA):
+    """Copia la base abierta en `origen` al archivo `destino`. Devuelve cuántas páginas copió."""
+    total = []
+
+    def progreso(estado, restantes, paginas_totales):
+        total[:] = [paginas_totales]
+        if restantes and pausa:
+            time.sleep(pausa)   # deja pasar a los escritores entre paso y paso
+
+    dst = sqlite3.connect(destino)
+    try:
+        origen.execute("BEGIN")
+        try:
+            # Fija la instantánea de lectura antes del primer paso
+            origen.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            origen.backup(dst, pages=paginas, progress=progreso)
+        finally:
+            origen.rollback()
+        # El respaldo es un archivo suelto: sin -wal ni -shm al lado
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+    return total[0] if total else 0
+
+
+def verificar(ruta, version=None):
+    """Lanza RespaldoInvalido si el archivo no pasa integrity_check o no tiene la versión esperada."""
+    # as_uri escapa '?', '#' y '%', que en una URI file: cambiarían la ruta
+    conn = sqlite3.connect(Path(os.path.abspath(ruta)).as_uri() + "?mode=ro", uri=True)
+    try:
+        resultado = [fila[0] for fila in conn.execute("PRAGMA integrity_check")]
+        if resultado != ["ok"]:
+            raise RespaldoInvalido(f"{ruta}: {'; '.join(resultado[:5])}")
+        encontrada = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version is not None and encontrada != version:
+            raise RespaldoInvalido(f"{ruta}: versión de esquema {encontrada}, se esperaba {version}")
+    except sqlite3.DatabaseError as e:
+        raise RespaldoInvalido(f"{ruta}: {e}") from None
+    finally:
+        conn.close()
+
+
+def _comprimir(ruta):
+    with open(ruta, "rb") as entrada, gzip.open(ruta + ".gz", "wb", compresslevel=6) as salida:
+        shutil.copyfileobj(entrada, salida, 1024 * 1024)
+    os.remove(ruta)
+    return ruta + ".gz"
+
+
+def respaldos(ruta_db, directorio=DIR_RESPALDOS):
+    """Respaldos existentes de `ruta_db`, del más nuevo al más viejo."""
+    if not os.path.isdir(directorio):
+        return []
+    prefijo = _prefijo(ruta_db)
+    nombres = [n for n in os.listdir(directorio)
+               if n.startswith(prefijo) and (n.endswith(".db") or n.endswith(".db.gz"))]
+    # El nombre lleva la fecha en formato ordenable
+    return [os.path.join(directorio, n) for n in sorted(nombres, reverse=True)]
+
+
+def rotar(ruta_db, directorio=DIR_RESPALDOS, conservar=CONSERVAR):
+    """Borra los respaldos que sobran. Devuelve las rutas borradas."""
+    sobrantes = respaldos(ruta_db, directorio)[conservar:] if conservar > 0 else []
+    for ruta in sobrantes:
+        os.remove(ruta)
+    return sobrantes
+
+
+def respaldar(ruta_db, directorio=DIR_RESPALDOS, comprimir=False, conservar=CONSERVAR,
+              paginas=PAGINAS_POR_PASO, pausa=PAUSA):
+    """Crea un respaldo verificado de `ruta_db` en `directorio`. Devuelve (ruta, segundos)."""
+    inicio = time.perf_counter()
+    os.makedirs(directorio, exist_ok=True)
+    nombre = f"{_prefijo(ruta_db)}{datetime.now().strftime(FORMATO_FECHA)}.db"
+    final = os.path.join(directorio, nombre)
+    temporal = os.path.join(directorio, ".tmp-" + nombre)
+    if not os.path.exists(ruta_db):
+        raise FileNotFoundError(ruta_db)
+    origen = sqlite3.connect(ruta_db, timeout=10.0)
+    try:
+        version = origen.execute("PRAGMA user_version").fetchone()[0]
+        copiar(origen, temporal, paginas, pausa)
+        verificar(temporal, version)
+        if comprimir:
+            temporal = _comprimir(temporal)
+            final += ".gz"
+        os.replace(temporal, final)
+    except BaseException:
+        for resto in (temporal, temporal + ".gz"):
+            if os.path.exists(resto):
+                os.remove(resto)
+        raise
+    finally:
+        origen.close()
+    rotar(ruta_db, directorio, conservar)
+    return final, time.perf_counter() - inicio
+
+
+class ProgramadorRespaldos:
+    """Hilo que hace un respaldo cada `intervalo` segundos."""
+
+    def __init__(self, ruta_db, intervalo, directorio=DIR_RESPALDOS, comprimir=True, conservar=CONSERVAR):
+        self.ruta_db = ruta_db
+        self.intervalo = intervalo
+        self.directorio = directorio
+        self.comprimir = comprimir
+        self.conservar = conservar
+        self.ultimo = None       # (ruta, segundos) del último respaldo correcto
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="alba-respaldos", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def _bucle(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.ultimo = respaldar(self.ruta_db, self.directorio, self.comprimir, self.conservar)
+                log.info("Respaldo %s en %.1f s", *self.ultimo)
+            except Exception:
+                log.exception("No se pudo respaldar %s", self.ruta_db)
+
+    def detener(self, timeout=10.0):
+        self._parar.set()
+        self._hilo.join(timeout)
@@ -0,0 +1,138 @@
+# ==========================================
+#      RETENCIÓN Y ARCHIVO DE FILAS ANTIGUAS
+# ==========================================
+# Productos ocupados, solicitudes viejas y mensajes ya leídos de hace meses
+# se mueven por lotes a una base aparte (archivo_udalba.db, adjunta con
+# ATTACH). Las tablas calientes, y con ellas el feed, la bandeja y las
+# búsquedas, quedan del tamaño de la actividad reciente. El archivo tiene las
+# mismas tablas y columnas (más la fecha en que se archivó), así que las
+# consultas del chat sirven tal cual para leer el historial archivado.
+#
+# Los lotes copian primero (INSERT OR IGNORE por id) y luego borran: si el
+# proceso se corta entre el commit del archivo y el de la base principal, la
+# siguiente pasada termina el trabajo sin duplicar nada.
+import os
+
+from alba import blobs, feed
+
+RUTA_ARCHIVO = os.environ.get("ALBA_ARCHIVO", "archivo_udalba.db")
+TAM_LOTE = 1_000
+PAGINAS_VACUUM = 2_000   # páginas liberadas por llamada a incremental_vacuum
+
+# tabla -> (días de antigüedad, condición extra, expresión de fecha)
+# Los productos cuentan desde que dejaron de estar disponibles (fecha_estado):
+# uno publicado hace un año y pausado ayer no se archiva.
+POLITICAS = {
+    "productos": (int(os.environ.get("ALBA_RETENER_PRODUCTOS_DIAS", 180)),
+                  "estado != 'Disponible'", "julianday(fecha_estado)"),
+    "solicitudes": (int(os.environ.get("ALBA_RETENER_SOLICITUDES_DIAS", 120)),
+                    "1", feed.fecha_juliana("fecha")),
+    "mensajes": (int(os.environ.get("ALBA_RETENER_MENSAJES_DIAS", 365)),
+                 "leido = 1", "julianday(fecha_hora)"),
+}
+
+COLUMNAS = {
+    "productos": ("id", "nombre", "descripcion", "precio", "estado", "email_dueño", "fecha",
+                  "foto_hash", "miniatura_hash", "media_hash"),
+    "solicitudes": ("id", "titulo", "presupuesto", "descripcion", "email_solicitante", "fecha"),
+    "mensajes": ("id", "remitente", "destinatario", "mensaje", "fecha_hora", "leido"),
+}
+
+# Entradas del feed que apuntan a lo archivado
+TIPO_FEED = {"productos": "p", "solicitudes": "s"}
+
+ESQUEMA_ARCHIVO = (
+    '''CREATE TABLE IF NOT EXISTS archivo.productos (
+            id INTEGER PRIMARY KEY, nombre TEXT, descripcion TEXT, precio INTEGER, estado TEXT,
+            email_dueño TEXT, fecha TEXT, foto_hash TEXT, miniatura_hash TEXT, media_hash TEXT,
+            archivado TEXT)''',
+    "CREATE INDEX IF NOT EXISTS archivo.idx_productos_dueño ON productos(email_dueño)",
+    '''CREATE TABLE IF NOT EXISTS archivo.solicitudes (
+            id INTEGER PRIMARY KEY, titulo TEXT, presupuesto INTEGER, descripcion TEXT,
+            email_solicitante TEXT, fecha TEXT, archivado TEXT)''',
+    "CREATE INDEX IF NOT EXISTS archivo.idx_solicitudes_solicitante ON solicitudes(email_solicitante)",
+    '''CREATE TABLE IF NOT EXISTS archivo.mensajes (
+            id INTEGER PRIMARY KEY, remitente TEXT, destinatario TEXT, mensaje TEXT,
+            fecha_hora TEXT, leido INTEGER, archivado TEXT)''',
+    # Mismo orden que recorre SQL_CHAT_ANTERIORES
+    "CREATE INDEX IF NOT EXISTS archivo.idx_mensajes_hilo ON mensajes(remitente, destinatario, id)",
+)
+
+
+def adjuntar(conn, ruta=RUTA_ARCHIVO):
+    """ATTACH del archivo como 'archivo', creando sus tablas si no existen."""
+    if not any(fila[1] == "archivo" for fila in conn.execute("PRAGMA database_list")):
+        conn.execute("ATTACH DATABASE ? AS archivo", (ruta,))
+        conn.execute("PRAGMA archivo.journal_mode=WAL")
+    for sentencia in ESQUEMA_ARCHIVO:
+        conn.execute(sentencia)
+    conn.commit()
+
+
+def _condicion(tabla, dias):
+    dias_politica, extra, fecha = POLITICAS[tabla]
+    dias = dias_politica if dias is None else dias
+    return f"{extra} AND {fecha} < julianday('now') - {float(dias)}"
+
+
+def candidatos(conn, tabla, dias=None):
+    """Cuántas filas de `tabla` cumple hoy la política (sin mover nada)."""
+    return conn.execute(f"SELECT COUNT(*) FROM main.{tabla} WHERE {_condicion(tabla, dias)}").fetchone()[0]
+
+
+def mover_lote(conn, tabla, dias=None, limite=TAM_LOTE):
+    """Archiva hasta `limite` filas de `tabla` en una transacción. Devuelve cuántas movió."""
+    columnas = ", ".join(COLUMNAS[tabla])
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        n = conn.execute(f"""INSERT INTO retencion_lote (id) SELECT id FROM main.{tabla}
+                             WHERE {_condicion(tabla, dias)} ORDER BY id LIMIT ?""", (limite,)).rowcount
+        if n:
+            conn.execute(f"""INSERT OR IGNORE INTO archivo.{tabla} ({columnas}, archivado)
+                             SELECT {columnas}, datetime('now') FROM main.{tabla}
+                             WHERE id IN (SELECT id FROM retencion_lote)""")
+            if tabla in TIPO_FEED:
+                conn.execute("""DELETE FROM feed_personalizado WHERE tipo = ?
+                                AND item_id IN (SELECT id FROM retencion_lote)""", (TIPO_FEED[tabla],))
+            conn.execute(f"DELETE FROM main.{tabla} WHERE id IN (SELECT id FROM retencion_lote)")
+            conn.execute("DELETE FROM retencion_lote")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return n
+
+
+def archivar(conn, tablas=tuple(POLITICAS), dias=None, limite=TAM_LOTE, avance=None):
+    """Aplica las políticas lote a lote hasta agotar candidatos. Devuelve {tabla: filas movidas}."""
+    adjuntar(conn)
+    movidas = {}
+    for tabla in tablas:
+        movidas[tabla] = 0
+        while True:
+            n = mover_lote(conn, tabla, dias, limite)
+            movidas[tabla] += n
+            if avance and n:
+                avance(tabla, movidas[tabla])
+            if n < limite:
+                break
+    return movidas
+
+
+def vacuum_incremental(conn, paginas=PAGINAS_VACUUM):
+    """Devuelve al sistema hasta `paginas` páginas libres. None si la base no tiene auto_vacuum incremental."""
+    if conn.execute("PRAGMA main.auto_vacuum").fetchone()[0] != 2:
+        return None
+    libres = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+    # executescript: con execute() el pragma solo avanza una página
+    conn.executescript(f"PRAGMA main.incremental_vacuum({int(paginas)});")
+    return libres - conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+
+
+def recolectar_fotos(conn, store, edad_minima=blobs.EDAD_MINIMA_GC):
+    """Borra del almacén las fotos que ya no usa ningún producto, vigente ni archivado."""
+    en_uso = blobs.claves_en_uso(conn)
+    if any(fila[1] == "archivo" for fila in conn.execute("PRAGMA database_list")):
+        filas = conn.execute("SELECT foto_hash, miniatura_hash, media_hash FROM archivo.productos")
+        en_uso |= {clave for fila in filas for clave in fila if clave}
+    return store.recolectar(en_uso, edad_minima)
@@ -0,0 +1 @@
+# Mediciones de rendimiento de Alba Conecta (datos sintéticos + tiempos por página)
@@ -0,0 +1,108 @@
+# ==========================================
+#       MEDICIONES DE RENDIMIENTO (CLI)
+# ==========================================
+# Uso (desde la carpeta donde estará la base de datos):
+#   python -m benchmarks sembrar --usuarios 2000 --mensajes 1000000
+#   python -m benchmarks medir --salida resultados.json
+# Los JSON de distintos commits se pueden comparar directamente.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from alba import db
+from benchmarks import datos, paginas
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(paginas.APP),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _volumenes(conn):
+    tablas = ["usuarios", "productos", "solicitudes", "mensajes", "resenas", "seguidores"]
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tablas}
+
+
+def cmd_sembrar(conn, args):
+    conteo = datos.sembrar(conn, usuarios=args.usuarios, productos=args.productos,
+                           solicitudes=args.solicitudes, mensajes=args.mensajes, resenas=args.resenas,
+                           seguidos=args.seguidos, fotos=args.fotos, semilla=args.semilla)
+    print(json.dumps(conteo, ensure_ascii=False))
+    return 0
+
+
+def cmd_medir(conn, args):
+    usuario = conn.execute("SELECT * FROM usuarios WHERE email = ?", (args.usuario,)).fetchone()
+    if usuario is None:
+        print(f"No existe {args.usuario}; ejecuta primero 'sembrar'.", file=sys.stderr)
+        return 1
+    if args.sin_cache:
+        os.environ["ALBA_CACHE_ENTRADAS"] = "0"
+    resultado = {
+        "commit": _commit(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "usuario": args.usuario,
+        "cache": not args.sin_cache,
+        "volumenes": _volumenes(conn),
+        "paginas": paginas.medir(usuario, paginas=args.paginas or paginas.PAGINAS,
+                                 repeticiones=args.repeticiones),
+    }
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    print(texto)
+    return 0
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Rendimiento de Alba Conecta")
+    parser.add_argument("--db", default=db.DB_PATH, help=f"base de datos (por defecto {db.DB_PATH})")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_sem = comandos.add_parser("sembrar", help="agregar datos sintéticos")
+    p_sem.add_argument("--usuarios", type=int, default=1_000)
+    p_sem.add_argument("--productos", type=int, default=5_000)
+    p_sem.add_argument("--solicitudes", type=int, default=1_000)
+    p_sem.add_argument("--mensajes", type=int, default=100_000)
+    p_sem.add_argument("--resenas", type=int, default=5_000)
+    p_sem.add_argument("--seguidos", type=int, default=20, help="seguidos promedio por usuario")
+    p_sem.add_argument("--fotos", type=int, default=10, help="fotos distintas (se reparten entre productos)")
+    p_sem.add_argument("--semilla", type=int, default=0)
+    p_sem.set_defaults(func=cmd_sembrar)
+
+    p_med = comandos.add_parser("medir", help="tiempos por página con AppTest")
+    p_med.add_argument("--usuario", default="u0@udalba.cl")
+    p_med.add_argument("--paginas", nargs="*", choices=paginas.PAGINAS)
+    p_med.add_argument("--repeticiones", type=int, default=20)
+    p_med.add_argument("--sin-cache", action="store_true", help="desactivar la caché de consultas")
+    p_med.add_argument("--salida", help="archivo JSON de resultados")
+    p_med.set_defaults(func=cmd_medir)
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.db != db.DB_PATH and args.comando == "medir":
+        # app.py abre siempre db.DB_PATH relativo a la carpeta actual
+        print("Para medir, ejecuta desde la carpeta de la base (sin --db).", file=sys.stderr)
+        return 2
+    pool = db.ConnectionPool(args.db, tamaño=1)
+    try:
+        with pool.conexion() as conn:
+            return args.func(conn, args)
+    finally:
+        pool.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# ==========================================
+#       GENERADOR DE DATOS SINTÉTICOS
+# ==========================================
+# Llena una base nueva (o existente) con volúmenes configurables. La actividad
+# sigue una distribución sesgada: unos pocos usuarios concentran la mayoría de
+# productos, mensajes y seguidores, como pasa en la app real. u0@udalba.cl es
+# siempre el usuario más activo y el que usan las mediciones.
+import io
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+
+from alba import blobs, credenciales, feed, migraciones
+
+CARRERAS = ["Ing. Civil Minas", "Ing. Civil Industrial", "Enfermería", "Derecho", "Geología", "Otras"]
+PREGUNTA = "Nombre de tu primera mascota"
+NOMBRES = ["Ana", "Beto", "Caro", "Diego", "Eli", "Fran", "Gabo", "Hilda", "Iván", "Jose", "Kari", "Lalo"]
+APELLIDOS = ["Rojas", "Muñoz", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Torres", "Araya", "Flores"]
+OBJETOS = ["calculadora", "bicicleta", "cámara", "trípode", "casco", "notebook", "libro", "carpa",
+           "mochila", "chaqueta", "lámpara", "escritorio", "silla", "parlante", "taladro", "microscopio"]
+ADJETIVOS = ["científica", "usada", "nueva", "reflex", "de seguridad", "gamer", "de cálculo",
+             "impermeable", "plegable", "eléctrico", "de geología", "como nuevo"]
+FRASES = ["hola", "¿sigue disponible?", "te lo arriendo por el fin de semana", "dale, trato hecho",
+          "¿dónde nos juntamos?", "en la biblioteca a las 14:00", "gracias!", "¿aceptas transferencia?"]
+
+TAM_LOTE = 50_000
+
+
+def _usuario(i):
+    return f"u{i}@udalba.cl"
+
+
+def _sesgado(rng, n):
+    # Índice en [0, n) con distribución tipo Zipf (el 0 es el más frecuente)
+    return min(int(rng.paretovariate(1.2)) - 1, n - 1)
+
+
+def _texto(rng, palabras):
+    return " ".join(rng.choice(palabras) for _ in range(rng.randint(2, 4)))
+
+
+def _foto(rng, ancho=1600, alto=1200):
+    # Ruido sobre un degradado: comprime como una foto real (cientos de KB)
+    from PIL import Image
+    base = Image.linear_gradient("L").resize((ancho, alto))
+    ruido = Image.effect_noise((ancho, alto), rng.randint(20, 60))
+    color = Image.merge("RGB", (base, ruido, Image.eval(base, lambda v: 255 - v)))
+    buf = io.BytesIO()
+    color.save(buf, "JPEG", quality=88)
+    return buf.getvalue()
+
+
+def _insertar(conn, sql, filas):
+    total = 0
+    filas = iter(filas)
+    while True:
+        lote = list(islice(filas, TAM_LOTE))
+        if not lote:
+            return total
+        total += conn.executemany(sql, lote).rowcount
+        conn.commit()
+
+
+def sembrar(conn, usuarios=1_000, productos=5_000, solicitudes=1_000, mensajes=100_000,
+            resenas=5_000, seguidos=20, fotos=10, semilla=0, avance=print):
+    """Agrega datos sintéticos y devuelve cuántas filas insertó por tabla."""
+    rng = random.Random(semilla)
+    migraciones.migrar(conn)
+    conn.execute("PRAGMA synchronous=OFF")
+    inicio = datetime(2025, 3, 1)
+    conteo = {}
+
+    clave = credenciales.hashear("clave")
+    respuesta = credenciales.hashear("firulais")
+    conteo["usuarios"] = _insertar(conn, "INSERT OR IGNORE INTO usuarios VALUES (?,?,?,?,?,?,?)", (
+        (_usuario(i), f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}", clave,
+         f"569{rng.randint(10_000_000, 99_999_999)}", rng.choice(CARRERAS), PREGUNTA, respuesta)
+        for i in range(usuarios)))
+    avance(f"usuarios: {conteo['usuarios']}")
+
+    hashes = [None]
+    if fotos:
+        store = blobs.BlobStore(blobs.DIR_BLOBS)
+        hashes += [blobs.guardar_foto(store, _foto(rng)) for _ in range(fotos)]
+        avance(f"fotos distintas: {fotos}")
+
+    def fila_producto(_):
+        foto = rng.choice(hashes) or (None, None, None)
+        dia = inicio + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        return ((_texto(rng, OBJETOS + ADJETIVOS)).capitalize(), _texto(rng, ADJETIVOS + OBJETOS),
+                rng.randrange(500, 200_000, 500), "Disponible" if rng.random() < 0.85 else "Ocupado",
+                _usuario(_sesgado(rng, usuarios)), dia.strftime("%d-%m-%Y")) + foto
+    conteo["productos"] = _insertar(conn, """INSERT INTO productos (nombre, descripcion, precio, estado,
+        email_dueño, fecha, foto_hash, miniatura_hash, media_hash) VALUES (?,?,?,?,?,?,?,?,?)""",
+        map(fila_producto, range(productos)))
+    avance(f"productos: {conteo['productos']}")
+
+    conteo["solicitudes"] = _insertar(conn, """INSERT INTO solicitudes (titulo, presupuesto, descripcion,
+        email_solicitante, fecha) VALUES (?,?,?,?,?)""", (
+        (f"Busco {_texto(rng, OBJETOS)}", rng.randrange(1_000, 100_000, 1_000), _texto(rng, ADJETIVOS),
+         _usuario(rng.randrange(usuarios)), inicio.strftime("%d-%m-%Y"))
+        for _ in range(solicitudes)))
+    avance(f"solicitudes: {conteo['solicitudes']}")
+
+    def pares(n):
+        for _ in range(n):
+            a, b = _sesgado(rng, usuarios), rng.randrange(usuarios)
+            if a != b:
+                yield _usuario(a), _usuario(b)
+
+    # Los famosos (índices bajos) son los más seguidos
+    conteo["seguidores"] = _insertar(conn, "INSERT OR IGNORE INTO seguidores (seguidor, seguido) VALUES (?,?)",
+                                     ((b, a) for a, b in pares(usuarios * seguidos)))
+    avance(f"seguidores: {conteo['seguidores']}")
+
+    conteo["resenas"] = _insertar(conn, """INSERT INTO resenas (calificador, calificado, estrellas,
+        comentario, fecha) VALUES (?,?,?,?,?)""", (
+        (b, a, rng.randint(1, 5), rng.choice(FRASES), inicio.strftime("%d-%m-%Y"))
+        for a, b in pares(resenas)))
+    avance(f"reseñas: {conteo['resenas']}")
+
+    # Mensajes repartidos en conversaciones; casi todos leídos salvo la cola
+    conversaciones = list(pares(max(usuarios * 3, 1)))
+
+    def fila_mensaje(i):
+        a, b = rng.choice(conversaciones)
+        if rng.random() < 0.5:
+            a, b = b, a
+        hora = inicio + timedelta(seconds=i * 30)
+        return a, b, rng.choice(FRASES), hora.strftime("%Y-%m-%d %H:%M"), int(i < mensajes - 500)
+    if conversaciones:
+        conteo["mensajes"] = _insertar(conn, """INSERT INTO mensajes (remitente, destinatario, mensaje,
+            fecha_hora, leido) VALUES (?,?,?,?,?)""", map(fila_mensaje, range(mensajes)))
+        avance(f"mensajes: {conteo['mensajes']}")
+
+    # Feeds "Para ti" ya calculados, como los dejaría el hilo de la app. El
+    # recálculo completo ya incluye los avisos anotados en feed_nuevos
+    conteo["feeds"] = feed.procesar_pendientes(conn)
+    conn.execute("DELETE FROM feed_nuevos")
+    conn.commit()
+    avance(f"feeds: {conteo['feeds']}")
+
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return conteo
@@ -0,0 +1,105 @@
+# ==========================================
+#       TIEMPOS POR PÁGINA CON AppTest
+# ==========================================
+# Ejecuta app.py sin navegador, con un usuario ya logueado, y mide cada página
+# del menú: latencia de la ejecución completa del script (p50/p95), cuántas
+# consultas hace y de dónde salen (caché, lectura, escritura) y el pico de
+# memoria asignada durante una ejecución.
+import os
+import statistics
+import time
+import tracemalloc
+
+from alba import db
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+PAGINAS = {
+    "Catálogo": "paginas/catalogo.py",
+    "Para ti": "paginas/para_ti.py",
+    "Publicar Aviso": "paginas/publicar.py",
+    "Muro de Solicitudes": "paginas/solicitudes.py",
+    "Mensajería": "paginas/mensajeria.py",
+    "Mi Perfil": "paginas/perfil.py",
+}
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))]
+
+
+class ContadorConsultas:
+    """Observador de db.ejecutar: acumula consultas y tiempo en BD."""
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.por_origen = {"cache": 0, "lectura": 0, "replica": 0, "escritura": 0}
+        self.segundos = 0.0
+
+    def __call__(self, query, params, segundos, origen, filas):
+        self.por_origen[origen] += 1
+        self.segundos += segundos
+
+    def __enter__(self):
+        db.OBSERVADORES.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        db.OBSERVADORES.remove(self)
+
+
+def _app(usuario, timeout):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.session_state["usuario_actual"] = usuario
+    return at
+
+
+def _error(at):
+    if at.exception:
+        return at.exception[0].value
+    errores = [e.value for e in at.error if e.value.startswith("Error en BD")]
+    return errores[0] if errores else None
+
+
+def medir_pagina(pagina, usuario, repeticiones=20, calentamiento=2, timeout=120):
+    at = _app(usuario, timeout).run()
+    at.switch_page(PAGINAS[pagina]).run()
+    for _ in range(calentamiento):
+        at.run()
+    error = _error(at)
+    if error:
+        raise RuntimeError(f"{pagina}: {error}")
+
+    tiempos, consultas, en_bd = [], [], []
+    with ContadorConsultas() as contador:
+        for _ in range(repeticiones):
+            contador.reiniciar()
+            inicio = time.perf_counter()
+            at.run()
+            tiempos.append(time.perf_counter() - inicio)
+            consultas.append(dict(contador.por_origen))
+            en_bd.append(contador.segundos)
+
+    # Memoria aparte: tracemalloc infla los tiempos
+    tracemalloc.start()
+    at.run()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 2),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 2),
+        "media_ms": round(statistics.fmean(tiempos) * 1000, 2),
+        "bd_p50_ms": round(percentil(en_bd, 50) * 1000, 2),
+        "consultas": {origen: round(statistics.fmean(c[origen] for c in consultas), 1)
+                      for origen in consultas[0]},
+        "memoria_pico_kb": round(pico / 1024, 1),
+        "repeticiones": repeticiones,
+    }
+
+
+def medir(usuario, paginas=PAGINAS, **opciones):
+    return {pagina: medir_pagina(pagina, usuario, **opciones) for pagina in paginas}
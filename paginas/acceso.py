@@ -0,0 +1,74 @@
+# ==========================================
+#     ACCESO: LOGIN, REGISTRO Y RECUPERACIÓN
+# ==========================================
+import streamlit as st
+
+from alba import consultas, credenciales
+from alba.componentes import LISTA_CARRERAS, LISTA_PREGUNTAS, flash
+
+try:
+    st.sidebar.image("logo.png", use_container_width=True)
+except:
+    st.sidebar.title("🎓 ALBA")
+st.markdown("<h1 style='text-align: center; color: #e6b800;'>🎓 Alba Conecta</h1>", unsafe_allow_html=True)
+
+menu_login = st.sidebar.selectbox("Bienvenido", ["Iniciar Sesión", "Registrarse", "Recuperar Contraseña"])
+
+if menu_login == "Iniciar Sesión":
+    st.subheader("Ingresa a tu cuenta")
+    email = st.text_input("Correo Institucional")
+    password = st.text_input("Contraseña", type='password')
+    if st.button("Entrar"):
+        user, error = consultas.login_user(email, password)
+        if user:
+            st.session_state['usuario_actual'] = user
+            flash(f"Bienvenido {user[1]}", "👋")
+            st.rerun()
+        else:
+            st.error(error)
+            
+elif menu_login == "Registrarse":
+    st.subheader("Crea tu cuenta nueva")
+    new_email = st.text_input("Correo (@udalba.cl)")
+    new_name = st.text_input("Nombre Completo")
+    new_pass = st.text_input("Contraseña", type='password')
+    new_wsp = st.text_input("WhatsApp (Ej: 56912345678)")
+    new_carrera = st.selectbox("Carrera", LISTA_CARRERAS)
+    st.markdown("---")
+    st.write("🔐 **Seguridad**")
+    new_preg = st.selectbox("Elige una pregunta de seguridad", LISTA_PREGUNTAS)
+    new_resp = st.text_input("Tu respuesta")
+    
+    if st.button("Crear Cuenta"):
+        if "@udalba.cl" in new_email and new_resp:
+            exito = consultas.register_user(new_email, new_name, new_pass, new_wsp, new_carrera, new_preg, new_resp)
+            if exito:
+                st.success("¡Cuenta creada! Ahora inicia sesión.")
+            else:
+                st.error("Ese correo ya está registrado.")
+        else:
+            st.warning("Revisa el correo y la pregunta de seguridad.")
+
+elif menu_login == "Recuperar Contraseña":
+    st.subheader("🔐 Recuperación de Acceso")
+    rec_email = st.text_input("Ingresa tu correo registrado")
+    if rec_email:
+        datos_user = consultas.get_pregunta(rec_email)
+        if datos_user:
+            st.info(f"Pregunta: **{datos_user[0]}**")
+            rec_respuesta = st.text_input("Tu respuesta", type="password")
+            new_pass_1 = st.text_input("Nueva Contraseña", type="password")
+            new_pass_2 = st.text_input("Repetir Contraseña", type="password")
+            if st.button("Restablecer"):
+                if credenciales.limitador_recuperacion.bloqueado(rec_email):
+                    st.error("Demasiados intentos. Vuelve a intentarlo más tarde.")
+                elif consultas.verificar_respuesta(rec_email, rec_respuesta, datos_user[1]):
+                    if new_pass_1 == new_pass_2 and len(new_pass_1) > 0:
+                        consultas.cambiar_password(rec_email, new_pass_1)
+                        st.success("✅ Contraseña actualizada.")
+                    else:
+                        st.error("Las contraseñas no coinciden.")
+                else:
+                    st.error("❌ Respuesta incorrecta.")
+        else:
+            st.warning("Correo no encontrado.")
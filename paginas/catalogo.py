@@ -0,0 +1,30 @@
+# ==========================================
+#           CATÁLOGO GENERAL
+# ==========================================
+import streamlit as st
+
+from alba import consultas
+from alba.componentes import controles_pagina, cursor_pagina, filtros_busqueda, tarjeta_producto
+from alba.consultas import TAM_PAGINA
+
+usuario = st.session_state['usuario_actual']
+
+st.title("🛒 Catálogo General")
+consulta, estado, precio_min, precio_max = filtros_busqueda("catalogo", "Precio", ["Disponible", "Ocupado"])
+filtros = (consulta, estado, precio_min, precio_max)
+if consulta:
+    # Resultados por relevancia: se pagina por posición
+    offset = cursor_pagina("pag_catalogo", filtros, inicial=0)
+    items, hay_mas = consultas.buscar_productos(usuario[0], consulta, offset, TAM_PAGINA, estado, precio_min, precio_max)
+    siguiente = offset + TAM_PAGINA
+else:
+    items, hay_mas = consultas.get_catalogo(usuario[0], cursor_pagina("pag_catalogo", filtros), TAM_PAGINA,
+                                            estado, precio_min, precio_max)
+    siguiente = items[-1][0] if items else None
+
+if items:
+    for item in items:
+        tarjeta_producto(item, usuario[0])
+else:
+    st.info("No hay productos disponibles.")
+controles_pagina("pag_catalogo", siguiente, hay_mas)
@@ -0,0 +1,30 @@
+# ==========================================
+#           MENSAJERÍA
+# ==========================================
+import streamlit as st
+
+from alba import consultas
+from alba.componentes import panel_chat
+
+usuario = st.session_state['usuario_actual']
+
+st.title("💬 Tu Buzón")
+contactos = consultas.get_bandeja(usuario[0])
+if contactos:
+    # Se elige por email: la etiqueta cambia con los no leídos pero la selección no
+    hilos = {c[0]: c for c in contactos}
+    def etiqueta_hilo(email):
+        hilo = hilos[email]
+        aviso = f" 🔔 {hilo[4]}" if hilo[4] > 0 else ""
+        return f"{hilo[1]}{aviso} · {hilo[3]}: {hilo[2]}"
+    email_otro = st.selectbox("Selecciona una conversación:", list(hilos.keys()), format_func=etiqueta_hilo)
+    
+    # --- MARCAR COMO LEÍDOS AL ENTRAR AL CHAT ---
+    if hilos[email_otro][4] > 0:
+        consultas.marcar_leidos(usuario[0], email_otro)
+    
+    st.divider()
+    # Se refresca solo mientras el hilo está abierto
+    panel_chat(usuario[0], email_otro)
+else:
+    st.info("No tienes conversaciones iniciadas.")
@@ -0,0 +1,27 @@
+# ==========================================
+#           PARA TI
+# ==========================================
+# Feed personalizado (seguidos, carrera, reputación y recencia) precalculado
+# por alba.feed: aquí solo se lee el top N ya ordenado.
+import streamlit as st
+
+from alba import consultas
+from alba.componentes import tarjeta_producto, tarjeta_solicitud
+
+usuario = st.session_state['usuario_actual']
+
+st.title("✨ Para ti")
+st.caption("Avisos de quienes sigues y de tu carrera, primero los mejor evaluados y más recientes.")
+
+items = consultas.get_para_ti(usuario[0])
+if items:
+    for item in items:
+        tarjeta_producto(item, usuario[0])
+else:
+    st.info("Estamos preparando tus recomendaciones. Mientras, revisa el Catálogo.")
+
+solicitudes = consultas.get_para_ti_solicitudes(usuario[0], limite=10)
+if solicitudes:
+    st.subheader("🙋‍♂️ Solicitudes que podrías responder")
+    for sol in solicitudes:
+        tarjeta_solicitud(sol, usuario[0])
@@ -0,0 +1,146 @@
+# ==========================================
+#           MI PERFIL
+# ==========================================
+import streamlit as st
+
+from alba import consultas
+from alba.componentes import LISTA_CARRERAS, flash
+
+usuario = st.session_state['usuario_actual']
+
+st.title("👤 Mi Perfil")
+
+c_stats_1, c_stats_2, c_stats_3 = st.columns(3)
+mi_promedio, mis_resenas, seguidores, seguidos = consultas.get_estadisticas(usuario[0])
+mi_rep = consultas.formato_reputacion(mi_promedio, mis_resenas)
+
+c_stats_1.metric("⭐ Reputación", mi_rep.split()[0])
+c_stats_2.metric("👥 Seguidores", seguidores)
+c_stats_3.metric("👀 Seguidos", seguidos)
+
+st.divider()
+
+tab_social_1, tab_social_2 = st.tabs(["👥 Mis Seguidores", "👀 A quién sigo"])
+
+with tab_social_1:
+    lista_seguidores = consultas.get_seguidores(usuario[0])
+    if lista_seguidores:
+        for seg in lista_seguidores:
+            st.write(f"👤 **{seg[0]}** ({seg[2]})")
+    else:
+        st.caption("Aún no tienes seguidores.")
+        
+with tab_social_2:
+    lista_seguidos = consultas.get_seguidos(usuario[0])
+    if lista_seguidos:
+        dic_seguidos = {f"{u[0]} ({u[2]})": u for u in lista_seguidos}
+        seleccionado_nombre = st.selectbox("Ver perfil de:", list(dic_seguidos.keys()))
+        
+        if seleccionado_nombre:
+            user_data = dic_seguidos[seleccionado_nombre]
+            email_view = user_data[1]
+            with st.container(border=True):
+                st.markdown(f"## Perfil de {user_data[0]}")
+                st.write(f"🎓 **Carrera:** {user_data[2]}")
+                st.write(f"⭐ **Reputación:** {consultas.get_reputacion(email_view)}")
+                
+                if st.button("🚫 Dejar de seguir a este usuario", key="unfol_profile"):
+                    consultas.dejar_de_seguir(usuario[0], email_view)
+                    flash(f"Dejaste de seguir a {user_data[0]}", "👋")
+                    st.rerun()
+
+                st.markdown("#### 📦 Sus Productos")
+                prods_view = consultas.get_productos_disponibles(email_view)
+                if prods_view:
+                    for p in prods_view:
+                        st.write(f"- {p[0]} (${p[1]})")
+                else:
+                    st.caption("No tiene productos activos.")
+                st.markdown("#### 🙋‍♂️ Sus Solicitudes")
+                sols_view = consultas.get_titulos_solicitudes(email_view)
+                if sols_view:
+                    for s in sols_view:
+                        st.write(f"- Busca: {s[0]}")
+                else:
+                    st.caption("No busca nada por ahora.")
+    else:
+        st.caption("No sigues a nadie todavía.")
+
+st.divider()
+with st.expander("🛠️ Gestionar mis datos personales", expanded=False):
+    with st.form("edit_p"):
+        na = st.text_input("Nombre", value=usuario[1])
+        wa = st.text_input("WhatsApp", value=usuario[3])
+        idx_carrera = 0
+        if usuario[4] in LISTA_CARRERAS:
+            idx_carrera = LISTA_CARRERAS.index(usuario[4])
+        nc = st.selectbox("Carrera", LISTA_CARRERAS, index=idx_carrera)
+        if st.form_submit_button("Guardar Datos"):
+            consultas.actualizar_datos(usuario[0], na, wa, nc)
+            # La fila de la sesión se actualiza en local, sin volver a leerla
+            st.session_state['usuario_actual'] = (usuario[0], na, usuario[2], wa, nc) + tuple(usuario[5:])
+            flash("Listo!")
+            st.rerun()
+    
+st.markdown("---")
+st.subheader("📦 Gestionar Productos")
+mis_p = consultas.get_mis_productos(usuario[0])
+
+if mis_p:
+    d_p = {f"{p[1]} (${p[3]}) - {p[4]}": p for p in mis_p}
+    s_p = st.selectbox("Seleccionar producto:", list(d_p.keys()))
+    dat = d_p[s_p]
+    
+    with st.form(f"edit_prod_{dat[0]}"):
+        st.caption(f"Editando: {dat[1]}")
+        new_nom = st.text_input("Nombre", value=dat[1])
+        new_desc = st.text_area("Descripción", value=dat[2])
+        new_pre = st.number_input("Precio", value=dat[3], step=500)
+        
+        if st.form_submit_button("💾 Guardar Cambios"):
+            consultas.actualizar_producto(dat[0], new_nom, new_desc, new_pre)
+            flash("Producto actualizado")
+            st.rerun()
+    
+    col_estado, col_borrar = st.columns([2,1])
+    with col_estado:
+        if dat[4] == "Disponible":
+            if st.button("⏸️ Pausar", key="pausar"):
+                consultas.cambiar_estado_producto(dat[0], "Ocupado")
+                st.rerun()
+        else:
+            if st.button("▶️ Reactivar", key="reactivar"):
+                consultas.cambiar_estado_producto(dat[0], "Disponible")
+                st.rerun()
+    with col_borrar:
+        if st.button("🗑️ Borrar", key="del_prod"):
+            consultas.borrar_producto(dat[0])
+            st.rerun()
+else:
+    st.caption("Nada publicado.")
+    
+st.markdown("---")
+st.subheader("🙋‍♂️ Gestionar Solicitudes")
+mis_sols = consultas.get_mis_solicitudes(usuario[0])
+
+if mis_sols:
+    dict_sols = {f"{s[1]} (${s[3]})": s for s in mis_sols}
+    sel_sol = st.selectbox("Editar solicitud:", list(dict_sols.keys()))
+    dat_sol = dict_sols[sel_sol]
+    
+    with st.form(f"edit_sol_{dat_sol[0]}"):
+        st.caption(f"Editando: {dat_sol[1]}")
+        n_tit = st.text_input("Título", value=dat_sol[1])
+        n_det = st.text_area("Detalles", value=dat_sol[2])
+        n_pres = st.number_input("Presupuesto", value=dat_sol[3], step=500)
+        
+        if st.form_submit_button("💾 Guardar Cambios"):
+            consultas.actualizar_solicitud(dat_sol[0], n_tit, n_det, n_pres)
+            flash("Solicitud actualizada")
+            st.rerun()
+    
+    if st.button("🗑️ Borrar Solicitud", key="del_sol"):
+        consultas.borrar_solicitud(dat_sol[0])
+        st.rerun()
+else:
+    st.caption("Nada solicitado.")
@@ -0,0 +1,22 @@
+# ==========================================
+#           PUBLICAR AVISO
+# ==========================================
+import streamlit as st
+
+from alba import blobs, consultas
+from alba.componentes import flash
+from alba.recursos import get_blobs
+
+usuario = st.session_state['usuario_actual']
+
+st.title("📢 Publicar Artículo")
+with st.form("form_prod"):
+    nombre = st.text_input("¿Qué arriendas?")
+    desc = st.text_area("Descripción")
+    precio = st.number_input("Precio diario", min_value=0, step=500)
+    foto = st.file_uploader("Foto del producto", type=['jpg','png'])
+    if st.form_submit_button("Publicar"):
+        hashes = blobs.guardar_foto(get_blobs(), foto.getvalue()) if foto else (None, None, None)
+        consultas.publicar_producto(usuario[0], nombre, desc, precio, hashes)
+        flash("¡Publicado!")
+        st.rerun()
@@ -0,0 +1,38 @@
+# ==========================================
+#           MURO DE SOLICITUDES
+# ==========================================
+import streamlit as st
+
+from alba import consultas
+from alba.componentes import controles_pagina, cursor_pagina, filtros_busqueda, flash, tarjeta_solicitud
+from alba.consultas import TAM_PAGINA
+
+usuario = st.session_state['usuario_actual']
+
+st.title("🙋‍♂️ Muro de Solicitudes")
+with st.expander("➕ Crear nueva solicitud"):
+    with st.form("form_solicitud"):
+        titulo = st.text_input("¿Qué necesitas?")
+        presupuesto = st.number_input("¿Cuánto ofreces? ($)", min_value=0, step=500)
+        desc_sol = st.text_area("Detalles")
+        if st.form_submit_button("Publicar Solicitud"):
+            consultas.publicar_solicitud(usuario[0], titulo, presupuesto, desc_sol)
+            flash("¡Solicitud publicada!")
+            st.rerun()
+st.divider()
+consulta, _, pres_min, pres_max = filtros_busqueda("solicitudes", "Presupuesto")
+filtros = (consulta, pres_min, pres_max)
+if consulta:
+    offset = cursor_pagina("pag_solicitudes", filtros, inicial=0)
+    solicitudes, hay_mas = consultas.buscar_solicitudes(usuario[0], consulta, offset, TAM_PAGINA, pres_min, pres_max)
+    siguiente = offset + TAM_PAGINA
+else:
+    solicitudes, hay_mas = consultas.get_solicitudes(usuario[0], cursor_pagina("pag_solicitudes", filtros), TAM_PAGINA,
+                                                     pres_min, pres_max)
+    siguiente = solicitudes[-1][6] if solicitudes else None
+if solicitudes:
+    for sol in solicitudes:
+        tarjeta_solicitud(sol, usuario[0])
+else:
+    st.info("Nadie busca nada por ahora.")
+controles_pagina("pag_solicitudes", siguiente, hay_mas)
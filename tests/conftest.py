@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from alba import db, migraciones
+
+# Esquema que creaba la primera versión de app.py (antes de las migraciones)
+ESQUEMA_BASE = """
+    CREATE TABLE usuarios (email TEXT PRIMARY KEY, nombre TEXT, password TEXT, whatsapp TEXT,
+                           carrera TEXT, pregunta TEXT, respuesta TEXT);
+    CREATE TABLE productos (id INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT, descripcion TEXT,
+                            precio INTEGER, estado TEXT, email_dueño TEXT, foto BLOB, fecha TEXT);
+    CREATE TABLE solicitudes (id INTEGER PRIMARY KEY AUTOINCREMENT, titulo TEXT, presupuesto INTEGER,
+                              descripcion TEXT, email_solicitante TEXT, fecha TEXT);
+    CREATE TABLE mensajes (id INTEGER PRIMARY KEY AUTOINCREMENT, remitente TEXT, destinatario TEXT,
+                           mensaje TEXT, fecha_hora TEXT, leido INTEGER DEFAULT 0);
+    CREATE TABLE resenas (id INTEGER PRIMARY KEY AUTOINCREMENT, calificador TEXT, calificado TEXT,
+                          estrellas INTEGER, comentario TEXT, fecha TEXT);
+    CREATE TABLE seguidores (id INTEGER PRIMARY KEY AUTOINCREMENT, seguidor TEXT, seguido TEXT);
+"""
+
+USUARIOS = [
+    ("ana@udalba.cl", "Ana", "Derecho"),
+    ("beto@udalba.cl", "Beto", "Derecho"),
+    ("caro@udalba.cl", "Caro", "Geología"),
+]
+
+
+@pytest.fixture
+def ruta_base(tmp_path, monkeypatch):
+    """Base con el esquema original y algunos datos; el almacén de fotos queda en tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    ruta = str(tmp_path / "base.db")
+    conn = sqlite3.connect(ruta)
+    conn.executescript(ESQUEMA_BASE)
+    conn.executemany("INSERT INTO usuarios (email, nombre, carrera) VALUES (?, ?, ?)", USUARIOS)
+    conn.executemany("INSERT INTO productos (nombre, descripcion, precio, estado, email_dueño, fecha) VALUES (?,?,?,?,?,?)",
+                     [("Bici", "roja", 1000, "Disponible", "ana@udalba.cl", "01-01-2026"),
+                      ("Carpa", "4 personas", 5000, "Pausado", "ana@udalba.cl", "02-01-2026")])
+    conn.execute("INSERT INTO solicitudes (titulo, presupuesto, descripcion, email_solicitante, fecha) "
+                 "VALUES ('Calculadora', 500, 'científica', 'beto@udalba.cl', '03-01-2026')")
+    conn.executemany("INSERT INTO seguidores (seguidor, seguido) VALUES (?, ?)",
+                     [("beto@udalba.cl", "ana@udalba.cl"), ("beto@udalba.cl", "ana@udalba.cl"),
+                      ("caro@udalba.cl", "ana@udalba.cl")])
+    conn.execute("INSERT INTO resenas (calificador, calificado, estrellas, comentario, fecha) "
+                 "VALUES ('beto@udalba.cl', 'ana@udalba.cl', 4, 'ok', '04-01-2026')")
+    conn.executemany("INSERT INTO mensajes (remitente, destinatario, mensaje, fecha_hora, leido) VALUES (?,?,?,?,?)",
+                     [("ana@udalba.cl", "beto@udalba.cl", "hola", "2026-01-05 10:00", 1),
+                      ("beto@udalba.cl", "ana@udalba.cl", "¿sigue la bici?", "2026-01-05 10:01", 0)])
+    conn.commit()
+    conn.close()
+    return ruta
+
+
+@pytest.fixture
+def pool(ruta_base):
+    """Pool sobre la base de ruta_base ya migrada."""
+    pool = db.ConnectionPool(ruta_base, tamaño=4)
+    with pool.conexion() as conn:
+        migraciones.migrar(conn)
+    yield pool
+    pool.cerrar()
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from alba import db
+
+# Sin busy_timeout: un lock ocupado falla al tiro y lo reintenta el escritor
+PRAGMAS_SIN_ESPERA = ("PRAGMA journal_mode=WAL",)
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = str(tmp_path / "prueba.db")
+    conn = sqlite3.connect(ruta)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, valor TEXT UNIQUE)")
+    conn.execute("INSERT INTO t (valor) VALUES ('a')")
+    conn.commit()
+    conn.close()
+    return ruta
+
+
+@pytest.fixture
+def pool(ruta):
+    pool = db.ConnectionPool(ruta, tamaño=4)
+    yield pool
+    pool.cerrar()
+
+
+def _valores(pool):
+    with pool.conexion() as conn:
+        return [v for (v,) in conn.execute("SELECT valor FROM t ORDER BY id")]
+
+
+def _envio(query, params=()):
+    return (((query, params),), False, Future())
+
+
+def test_sentencia_fallida_no_deshace_el_resto_del_lote(pool):
+    escritor = db.Escritor(pool)
+    try:
+        lote = [_envio("INSERT INTO t (valor) VALUES ('b')"),
+                _envio("INSERT INTO t (valor) VALUES ('a')"),   # viola UNIQUE
+                _envio("INSERT INTO t (valor) VALUES ('c')")]
+        resultados = escritor._aplicar(lote)
+    finally:
+        escritor.cerrar()
+
+    assert [error is None for _, error in resultados] == [True, False, True]
+    assert isinstance(resultados[1][1], sqlite3.IntegrityError)
+    assert _valores(pool) == ["a", "b", "c"]
+
+
+def test_grupo_fallido_se_deshace_entero(pool):
+    escritor = db.Escritor(pool)
+    try:
+        futuro = escritor.enviar_grupo([("INSERT INTO t (valor) VALUES ('b')", ()),
+                                        ("INSERT INTO t (valor) VALUES ('a')", ())])
+        with pytest.raises(sqlite3.IntegrityError):
+            futuro.result(timeout=5)
+        assert escritor.enviar("INSERT INTO t (valor) VALUES ('c')").result(timeout=5) is None
+    finally:
+        escritor.cerrar()
+    assert _valores(pool) == ["a", "c"]
+
+
+def _ocupar(ruta, segundos):
+    # Toma el lock de escritura desde otra conexión durante `segundos`
+    tomado = threading.Event()
+
+    def ocupar():
+        conn = sqlite3.connect(ruta, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        tomado.set()
+        threading.Event().wait(segundos)
+        conn.execute("COMMIT")
+        conn.close()
+
+    hilo = threading.Thread(target=ocupar)
+    hilo.start()
+    tomado.wait(5)
+    return hilo
+
+
+def test_reintenta_mientras_la_base_esta_ocupada(ruta):
+    pool = db.ConnectionPool(ruta, tamaño=2, timeout=0.0, pragmas=PRAGMAS_SIN_ESPERA)
+    escritor = db.Escritor(pool, reintentos=10, espera=0.02)
+    hilo = _ocupar(ruta, 0.3)
+    try:
+        escritor.enviar("INSERT INTO t (valor) VALUES ('b')").result(timeout=10)
+    finally:
+        hilo.join()
+        escritor.cerrar()
+    assert _valores(pool) == ["a", "b"]
+    pool.cerrar()
+
+
+def test_agota_los_reintentos_y_propaga_el_error(ruta):
+    pool = db.ConnectionPool(ruta, tamaño=2, timeout=0.0, pragmas=PRAGMAS_SIN_ESPERA)
+    escritor = db.Escritor(pool, reintentos=2, espera=0.01)
+    hilo = _ocupar(ruta, 1.0)
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            escritor.enviar("INSERT INTO t (valor) VALUES ('b')").result(timeout=10)
+    finally:
+        hilo.join()
+        escritor.cerrar()
+    assert _valores(pool) == ["a"]
+    pool.cerrar()
+
+
+def test_invalida_la_cache_antes_de_resolver_el_futuro(pool):
+    cache = db.CacheConsultas()
+    escritor = db.Escritor(pool, cache=cache)
+    lectura = "SELECT valor FROM t ORDER BY id"
+    try:
+        assert db.ejecutar(pool, lectura, return_data=True, cache=cache) == [("a",)]
+        assert cache.obtener(lectura, ()) == [("a",)]
+
+        vista_al_resolver = []
+        futuro = escritor.enviar("INSERT INTO t (valor) VALUES ('b')")
+        # El callback corre en el hilo escritor justo al resolverse el futuro
+        futuro.add_done_callback(lambda _: vista_al_resolver.append(cache.obtener(lectura, ())))
+        futuro.result(timeout=5)
+    finally:
+        escritor.cerrar()
+
+    assert vista_al_resolver == [db._FALTA]
+    assert db.ejecutar(pool, lectura, return_data=True, cache=cache) == [("a",), ("b",)]
+
+
+def test_no_guarda_una_lectura_que_cruzo_una_escritura():
+    cache = db.CacheConsultas(dependencias={"t": {"resumen"}})
+    lectura = "SELECT total FROM resumen"
+    assert cache.obtener(lectura, ()) is db._FALTA
+    marca = cache.marca(lectura)
+    # Entre la consulta y el guardado se confirma una escritura que, por
+    # trigger, cambia lo que se leyó
+    cache.invalidar_escritura("INSERT INTO t (valor) VALUES ('b')")
+    cache.guardar(lectura, (), [(1,)], marca)
+
+    assert cache.obtener(lectura, ()) is db._FALTA
+    assert cache.metricas()["descartes"] == 1
+
+    cache.guardar(lectura, (), [(2,)], cache.marca(lectura))
+    assert cache.obtener(lectura, ()) == [(2,)]
+
+
+def test_escritura_sin_confirmar_vence(pool, monkeypatch):
+    class EscritorDetenido:
+        def enviar(self, query, params=(), return_data=False):
+            return Future()   # nunca se resuelve
+
+    monkeypatch.setattr(db, "ESPERA_ESCRITURA", 0.05)
+    with pytest.raises(TimeoutError, match="no se confirmó"):
+        db.ejecutar(pool, "INSERT INTO t (valor) VALUES ('b')", escritor=EscritorDetenido())
+
+
+def test_pool_agotado_da_un_error_de_sqlite(ruta):
+    pool = db.ConnectionPool(ruta, tamaño=1, timeout=0.05)
+    try:
+        with pool.conexion():
+            with pytest.raises(sqlite3.OperationalError, match="pool agotado"):
+                with pool.conexion():
+                    pass
+    finally:
+        pool.cerrar()
@@ -0,0 +1,52 @@
+import pytest
+
+from alba import estadisticas
+
+# Una o más sentencias por trigger de contadores; después de cada caso los
+# contadores guardados deben coincidir con los recalculados desde cero.
+CASOS = {
+    "resenas_contar_insert": [
+        "INSERT INTO resenas (calificador, calificado, estrellas, comentario, fecha) "
+        "VALUES ('caro@udalba.cl', 'ana@udalba.cl', 5, 'bien', '06-01-2026')"],
+    "resenas_contar_delete": ["DELETE FROM resenas WHERE calificador = 'beto@udalba.cl'"],
+    "resenas_contar_update estrellas": ["UPDATE resenas SET estrellas = 1"],
+    "resenas_contar_update calificado": ["UPDATE resenas SET calificado = 'caro@udalba.cl'"],
+    "seguidores_contar_insert": [
+        "INSERT INTO seguidores (seguidor, seguido) VALUES ('ana@udalba.cl', 'caro@udalba.cl')"],
+    "seguidores_contar_delete": ["DELETE FROM seguidores WHERE seguidor = 'caro@udalba.cl'"],
+    "seguidores_contar_update": [
+        "UPDATE seguidores SET seguido = 'caro@udalba.cl', seguidor = 'ana@udalba.cl' "
+        "WHERE seguidor = 'beto@udalba.cl'"],
+    "mensajes_no_leidos_insert": [
+        "INSERT INTO mensajes (remitente, destinatario, mensaje, fecha_hora) "
+        "VALUES ('caro@udalba.cl', 'ana@udalba.cl', 'hola', '2026-01-06 09:00')",
+        "INSERT INTO mensajes (remitente, destinatario, mensaje, fecha_hora, leido) "
+        "VALUES ('caro@udalba.cl', 'beto@udalba.cl', 'leído', '2026-01-06 09:01', 1)"],
+    "mensajes_no_leidos_delete": ["DELETE FROM mensajes"],
+    "mensajes_no_leidos_update leido": ["UPDATE mensajes SET leido = 1 - leido"],
+    "mensajes_no_leidos_update destinatario": ["UPDATE mensajes SET destinatario = 'caro@udalba.cl'"],
+}
+
+
+@pytest.mark.parametrize("sentencias", CASOS.values(), ids=CASOS.keys())
+def test_triggers_mantienen_los_contadores(pool, sentencias):
+    with pool.conexion() as conn:
+        for sentencia in sentencias:
+            assert conn.execute(sentencia).rowcount > 0
+        conn.commit()
+        assert estadisticas.verificar(conn) == []
+
+
+def test_verificar_detecta_y_reconstruir_repara(pool):
+    with pool.conexion() as conn:
+        conn.execute("UPDATE estadisticas_usuario SET seguidores = 99 WHERE email = 'ana@udalba.cl'")
+        conn.execute("UPDATE no_leidos SET n = 7 WHERE email = 'ana@udalba.cl'")
+        conn.commit()
+        [(email, guardado, calculado)] = estadisticas.verificar(conn)
+        assert email == "ana@udalba.cl"
+        assert guardado[2] == 99 and guardado[-1] == 7
+        assert calculado[2] == 2 and calculado[-1] == 1
+
+        estadisticas.reconstruir(conn)
+        conn.commit()
+        assert estadisticas.verificar(conn) == []
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from alba import feed
+
+
+def _puntajes(conn, item_id):
+    return dict(conn.execute("SELECT email, puntaje FROM feed_personalizado WHERE tipo = 'p' AND item_id = ?",
+                             (item_id,)))
+
+
+def test_aviso_nuevo_se_puntua_igual_que_en_el_recalculo_completo(pool):
+    actualizador = feed.ActualizadorFeed(pool, pausa=0)
+    actualizador.vuelta()   # feeds iniciales de todos
+    with pool.conexion() as conn:
+        conn.execute("INSERT INTO productos (nombre, descripcion, precio, estado, email_dueño, fecha) "
+                     "VALUES ('Mochila', 'azul', 3000, 'Disponible', 'ana@udalba.cl', ?)",
+                     (datetime.now().strftime("%d-%m-%Y"),))
+        conn.commit()
+        item_id = conn.execute("SELECT MAX(id) FROM productos").fetchone()[0]
+        assert conn.execute("SELECT tipo, item_id FROM feed_nuevos").fetchall() == [("p", item_id)]
+        assert conn.execute("SELECT COUNT(*) FROM feed_pendientes").fetchone()[0] == 0
+
+    assert actualizador.vuelta() == (1, 0)
+    with pool.conexion() as conn:
+        incremental = _puntajes(conn, item_id)
+        assert conn.execute("SELECT COUNT(*) FROM feed_nuevos").fetchone()[0] == 0
+        # Beto sigue a Ana y es de su carrera; Caro la sigue
+        assert set(incremental) == {"beto@udalba.cl", "caro@udalba.cl"}
+        feed.marcar_todos(conn)
+        conn.commit()
+
+    actualizador.vuelta()
+    with pool.conexion() as conn:
+        completo = _puntajes(conn, item_id)
+    assert incremental.keys() == completo.keys()
+    for email, puntaje in incremental.items():
+        assert abs(puntaje - completo[email]) < 1e-6
+
+
+def test_seguir_pide_recalculo_completo(pool):
+    with pool.conexion() as conn:
+        conn.execute("DELETE FROM feed_pendientes")
+        conn.execute("INSERT INTO seguidores (seguidor, seguido) VALUES ('ana@udalba.cl', 'caro@udalba.cl')")
+        conn.commit()
+        assert conn.execute("SELECT email FROM feed_pendientes").fetchall() == [("ana@udalba.cl",)]
+
+
+def _nuevo_producto(conn):
+    conn.execute("INSERT INTO productos (nombre, descripcion, precio, estado, email_dueño, fecha) "
+                 "VALUES ('Mochila', 'azul', 3000, 'Disponible', 'ana@udalba.cl', ?)",
+                 (datetime.now().strftime("%d-%m-%Y"),))
+    conn.commit()
+    return conn.execute("SELECT MAX(id) FROM productos").fetchone()[0]
+
+
+def test_aviso_nuevo_recorta_el_feed_al_tamaño(pool):
+    feed.ActualizadorFeed(pool, pausa=0).vuelta()
+    with pool.conexion() as conn:
+        assert conn.execute("SELECT item_id FROM feed_personalizado WHERE email = 'beto@udalba.cl' AND tipo = 'p'"
+                            ).fetchall() == [(1,)]
+        item_id = _nuevo_producto(conn)
+        for query, params in feed.sentencias_nuevo("p", item_id, tamaño=1):
+            conn.execute(query, params)
+        conn.commit()
+        assert conn.execute("SELECT item_id FROM feed_personalizado WHERE email = 'beto@udalba.cl' AND tipo = 'p'"
+                            ).fetchall() == [(item_id,)]
+
+
+def test_otro_proceso_no_repite_un_aviso_ya_tomado(pool):
+    # Dos hilos de feed (uno por proceso) ven la misma fila en feed_nuevos
+    uno = feed.ActualizadorFeed(pool, pausa=0)
+    otro = feed.ActualizadorFeed(pool, pausa=0)
+    uno.vuelta()
+    with pool.conexion() as conn:
+        item_id = _nuevo_producto(conn)
+    assert uno._transaccion(feed.sentencias_nuevo("p", item_id), reclamar=True)
+    assert not otro._transaccion(feed.sentencias_nuevo("p", item_id), reclamar=True)
+    assert otro.vuelta() == (0, 0)
@@ -0,0 +1,52 @@
+import sqlite3
+from io import BytesIO
+
+from PIL import Image
+
+from alba import blobs, estadisticas, migraciones
+
+
+def test_migrar_desde_el_esquema_original(ruta_base):
+    conn = sqlite3.connect(ruta_base)
+    aplicadas = migraciones.migrar(conn)
+
+    assert aplicadas == [version for version, *_ in migraciones.MIGRACIONES]
+    assert migraciones.version_actual(conn) == migraciones.MIGRACIONES[-1][0]
+    assert estadisticas.verificar(conn) == []
+    # Seguidores duplicados se quitan al crear el índice único
+    assert conn.execute("SELECT COUNT(*) FROM seguidores").fetchone()[0] == 2
+    assert conn.execute("SELECT seguidores, total_resenas FROM estadisticas_usuario WHERE email = 'ana@udalba.cl'"
+                        ).fetchone() == (2, 1)
+    assert conn.execute("SELECT n FROM no_leidos WHERE email = 'ana@udalba.cl'").fetchone() == (1,)
+    assert conn.execute("SELECT ultimo_id, no_leidos_a FROM conversaciones").fetchone() == (2, 1)
+    assert conn.execute("SELECT rowid FROM productos_fts WHERE productos_fts MATCH 'bici'").fetchall() == [(1,)]
+    assert migraciones.migrar(conn) == []
+    conn.close()
+
+
+def test_migrar_mueve_las_fotos_al_almacen(ruta_base):
+    conn = sqlite3.connect(ruta_base)
+    buf = BytesIO()
+    Image.new("RGB", (40, 30), (255, 0, 0)).save(buf, "PNG")
+    conn.execute("UPDATE productos SET foto = ? WHERE id = 1", (buf.getvalue(),))
+    conn.commit()
+
+    migraciones.migrar(conn)
+
+    columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(productos)")}
+    assert "foto" not in columnas
+    claves = conn.execute("SELECT foto_hash, miniatura_hash, media_hash FROM productos WHERE id = 1").fetchone()
+    store = blobs.BlobStore(blobs.DIR_BLOBS)
+    assert all(clave and store.existe(clave) for clave in claves)
+    conn.close()
+
+
+def test_migrar_sin_vacuum_lo_deja_pendiente(ruta_base):
+    conn = sqlite3.connect(ruta_base)
+    migraciones.migrar(conn, vacuum=False)
+    assert migraciones.falta_vacuum(conn)
+
+    # La próxima corrida de 'python -m alba' lo hace aunque no quede nada por migrar
+    assert migraciones.migrar(conn) == []
+    assert not migraciones.falta_vacuum(conn)
+    conn.close()
@@ -0,0 +1,14 @@
+from alba import perfilado
+
+
+def test_aparte_no_suma_a_la_ejecucion_completa():
+    registro = perfilado.RegistroConsultas(pool=None, umbral_ms=1e9)
+    rerun = perfilado.iniciar_rerun("Catálogo")
+    registro("SELECT 1", (), 0.001, "lectura", 1)
+    with perfilado.aparte("fragmento panel_chat"):
+        registro("SELECT 2", (), 0.001, "lectura", 1)
+    registro("SELECT 3", (), 0.001, "lectura", 1)
+
+    assert [r["pagina"] for r in registro.historial()] == ["Catálogo", "fragmento panel_chat", "Catálogo"]
+    assert rerun.totales()["consultas"] == 2
+    assert perfilado.rerun_actual() is rerun
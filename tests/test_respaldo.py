@@ -0,0 +1,19 @@
+import sqlite3
+
+import pytest
+
+from alba import respaldo
+
+
+@pytest.mark.parametrize("nombre", ["respaldo.db", "copia #2 al 100%?.db"])
+def test_verificar_acepta_cualquier_nombre_de_archivo(tmp_path, nombre):
+    ruta = str(tmp_path / nombre)
+    conn = sqlite3.connect(ruta)
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("PRAGMA user_version = 3")
+    conn.commit()
+    conn.close()
+
+    respaldo.verificar(ruta, version=3)
+    with pytest.raises(respaldo.RespaldoInvalido, match="versión de esquema 3"):
+        respaldo.verificar(ruta, version=4)
@@ -0,0 +1,20 @@
+from alba import retencion
+
+
+def test_productos_se_archivan_por_tiempo_sin_estar_disponibles(pool):
+    with pool.conexion() as conn:
+        # Publicado hace años, pero pausado recién: se queda
+        conn.execute("UPDATE productos SET fecha = '01-01-2020' WHERE nombre = 'Carpa'")
+        conn.execute("UPDATE productos SET estado = 'Vendido' WHERE nombre = 'Carpa'")
+        conn.commit()
+        assert conn.execute("SELECT date(fecha_estado) = date('now') FROM productos WHERE nombre = 'Carpa'"
+                            ).fetchone() == (1,)
+        assert retencion.candidatos(conn, "productos") == 0
+
+        # Pausado hace más de la política: se archiva
+        conn.execute("UPDATE productos SET fecha_estado = datetime('now', '-400 days') WHERE nombre = 'Carpa'")
+        conn.commit()
+        movidas = retencion.archivar(conn, tablas=("productos",))
+        assert movidas == {"productos": 1}
+        assert conn.execute("SELECT nombre FROM productos").fetchall() == [("Bici",)]
+        assert conn.execute("SELECT nombre FROM archivo.productos").fetchall() == [("Carpa",)]